@@ -0,0 +1,145 @@
+"""
+🔥 Gaming Workforce Observatory - Préchauffage du Cache
+Précalcule les résultats mis en cache de chaque page en arrière-plan
+"""
+
+import threading
+import time
+from datetime import datetime
+
+
+class CacheWarmer:
+    def __init__(self, tasks, version_fn, poll_interval=30, priority=1, max_backoff=3600):
+        # tasks : liste de (nom, fonction(version)) dont le résultat est mis en cache,
+        # les `priority` premières (page par défaut) suffisent au premier affichage
+        self.tasks = tasks
+        self.version_fn = version_fn
+        self.poll_interval = poll_interval
+        self.priority = min(priority, len(tasks))
+        self.max_backoff = max_backoff
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._ready_changed = threading.Condition(self._lock)
+        self._thread = None
+        self._watcher = None
+        self._status = {
+            'version': None,
+            'ready_version': None,
+            'state': 'idle',
+            'done': 0,
+            'total': len(tasks),
+            'timings': {},
+            'errors': {},
+            'started_at': None,
+            'finished_at': None
+        }
+
+    def start(self):
+        """Préchauffe la version courante puis surveille ses changements"""
+        self.ensure(self.version_fn())
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name='cache-watcher', daemon=True)
+            self._watcher.start()
+        return self
+
+    def ensure(self, version, retry=False):
+        """Lance un préchauffage si cette version n'est ni prête ni en cours
+
+        Une version en échec n'est relancée qu'avec `retry` (surveillance,
+        avec délai croissant), jamais à chaque appel.
+        """
+        with self._lock:
+            if self._status['version'] == version and (self._status['state'] != 'failed' or not retry):
+                return False
+            running = self._thread is not None and self._thread.is_alive()
+            if running and self._thread is not threading.current_thread():
+                # Le préchauffage en cours reprendra la nouvelle version à la fin
+                return False
+            if self._status['version'] != version:
+                self._failures = 0
+            self._status.update({
+                'version': version,
+                'state': 'running',
+                'done': 0,
+                'timings': {},
+                'errors': {},
+                'started_at': datetime.now(),
+                'finished_at': None
+            })
+            self._thread = threading.Thread(
+                target=self._run, args=(version,), name='cache-warmup', daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def serve(self, version, timeout=15):
+        """Version à afficher : la dernière entièrement préchauffée
+
+        Lance le préchauffage de `version` sans attendre la surveillance
+        périodique ; tant qu'il n'est pas terminé, la version précédente
+        (déjà en cache) reste servie. Au démarrage, sans version prête,
+        attend au plus `timeout` secondes les seules tâches prioritaires,
+        les autres pages continuant en arrière-plan.
+        """
+        self.ensure(version)
+        with self._ready_changed:
+            self._ready_changed.wait_for(self._servable, timeout)
+            return self._status['ready_version'] or version
+
+    def _servable(self):
+        status = self._status
+        return status['ready_version'] is not None or status['done'] >= self.priority
+
+    def _retry_due(self):
+        """Vrai si la version en échec peut être relancée (délai doublé à chaque échec)"""
+        with self._lock:
+            if self._status['state'] != 'failed':
+                return False
+            delay = min(self.poll_interval * 2 ** self._failures, self.max_backoff)
+            return (datetime.now() - self._status['finished_at']).total_seconds() >= delay
+
+    def progress(self):
+        """Copie de l'état du préchauffage (version, avancement, durées)"""
+        with self._lock:
+            status = dict(self._status)
+            status['timings'] = dict(status['timings'])
+            status['errors'] = dict(status['errors'])
+            return status
+
+    def _run(self, version):
+        print(f"🔥 Préchauffage du cache (version {version})...")
+        start = time.perf_counter()
+
+        for name, task in self.tasks:
+            task_start = time.perf_counter()
+            try:
+                task(version)
+            except Exception as e:
+                with self._lock:
+                    self._status['errors'][name] = str(e)
+                print(f"❌ Erreur préchauffage {name}: {e}")
+            with self._lock:
+                self._status['timings'][name] = time.perf_counter() - task_start
+                self._status['done'] += 1
+                self._ready_changed.notify_all()
+
+        with self._lock:
+            self._status['state'] = 'failed' if self._status['errors'] else 'done'
+            self._failures = self._failures + 1 if self._status['errors'] else 0
+            self._status['finished_at'] = datetime.now()
+            # Même en échec partiel : les pages en erreur seront calculées à la demande
+            self._status['ready_version'] = version
+            self._ready_changed.notify_all()
+        print(f"✅ Cache préchauffé en {time.perf_counter() - start:.2f}s")
+
+        # Les données ont pu changer pendant le préchauffage (une version en
+        # échec n'est pas relancée ici, seulement par la surveillance)
+        self.ensure(self.version_fn())
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.ensure(self.version_fn(), retry=self._retry_due())
+            except Exception as e:
+                print(f"❌ Erreur surveillance des données: {e}")
@@ -0,0 +1,219 @@
+"""
+💱 Gaming Workforce Observatory - Conversion de Devises
+Taux de change datés et parités de pouvoir d'achat (PPA) lus depuis
+data/fx_rates.json, conversions vectorisées et mémoïsées par devise
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FX_FILE = 'data/fx_rates.json'
+BASE = 'USD'
+
+# Vues spéciales : devise locale de chaque ligne, ou dollars internationaux (PPA)
+LOCAL = 'LOCAL'
+PPP = 'PPP'
+
+# Colonnes de montants stockées en USD, et colonnes de localisation
+SALARY_COLUMNS = ('gaming_salary_usd', 'tech_salary_usd', 'avg_salary_usd', 'avg_gaming_salary')
+LOCATION_COLUMNS = ('country', 'region')
+
+CURRENCY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥', 'CNY': 'CN¥', 'KRW': '₩'}
+
+
+def currency_unit(currency):
+    """Unité affichée dans les libellés : '$', '€', 'devise locale'..."""
+    if currency == LOCAL:
+        return "devise locale"
+    if currency == PPP:
+        return "$ PPA"
+    return CURRENCY_SYMBOLS.get(currency, currency)
+
+
+def frame_currency(df, currency):
+    """Devise des montants d'une table convertie (sans lieu, elle reste en USD)"""
+    if currency in (LOCAL, PPP) and not any(c in df.columns for c in LOCATION_COLUMNS):
+        return BASE
+    return currency
+
+
+def frame_unit(df, currency):
+    """Unité des montants d'une table convertie"""
+    return currency_unit(frame_currency(df, currency))
+
+
+def amount_column(df, column, currency):
+    """Nom d'une colonne de montant après conversion, ex. gaming_salary_usd -> gaming_salary_eur"""
+    target = frame_currency(df, currency)
+    if target == BASE:
+        return column
+    stem = column[:-len('_usd')] if column.endswith('_usd') else column
+    return f"{stem}_{target.lower()}"
+
+
+class FxRates:
+    """Tables de taux datées (1 USD = x devise) et facteurs PPA par lieu"""
+
+    def __init__(self, rates, ppp, currencies, base=BASE, stamp=None):
+        self.base = base
+        self.rates = dict(sorted(rates.items()))
+        self.ppp = dict(sorted(ppp.items()))
+        self.currencies = currencies
+        self.stamp = stamp
+
+    @classmethod
+    def from_file(cls, path=FX_FILE, stamp=None):
+        with open(path, encoding='utf-8') as f:
+            raw = json.load(f)
+        return cls(raw['rates'], raw.get('ppp', {}), raw.get('currencies', {}),
+                   raw.get('base', BASE), stamp)
+
+    def dates(self):
+        return list(self.rates)
+
+    def codes(self):
+        """Devises disponibles, devise de base en tête"""
+        codes = {code for table in self.rates.values() for code in table}
+        return [self.base] + sorted(codes - {self.base})
+
+    def resolve_date(self, date=None):
+        """Date de la table applicable : la plus récente au plus tard à `date`"""
+        dates = self.dates()
+        if date is None:
+            return dates[-1]
+        eligible = [d for d in dates if d <= str(date)]
+        return eligible[-1] if eligible else dates[0]
+
+    def rate(self, currency, date=None):
+        if currency == self.base:
+            return 1.0
+        table = self.rates[self.resolve_date(date)]
+        if currency not in table:
+            raise KeyError(f"Pas de taux {currency} au {self.resolve_date(date)}")
+        return table[currency]
+
+    def _ppp_table(self, date=None):
+        year = self.resolve_date(date)[:4]
+        years = [y for y in self.ppp if y <= year] or list(self.ppp)[:1]
+        return self.ppp[years[-1]] if years else {}
+
+    def location_factors(self, locations, view, date=None):
+        """Facteur multiplicatif par lieu (devise locale ou PPA), lieux inconnus en USD"""
+        ppp = self._ppp_table(date)
+        factors = {}
+        for location in locations:
+            currency = self.currencies.get(location, self.base)
+            factor = self.rate(currency, date)
+            if view == PPP:
+                # Montant local / (unités locales par dollar international)
+                factor /= ppp.get(location, factor)
+            factors[location] = factor
+        return factors
+
+
+@lru_cache(maxsize=4)
+def _read_rates(path, stamp):
+    return FxRates.from_file(path, stamp)
+
+
+def fx_stamp(path=FX_FILE):
+    """Empreinte (taille, date de modification) du fichier de taux"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_rates(path=FX_FILE):
+    """Taux du fichier local, relus seulement s'il a changé"""
+    return _read_rates(path, fx_stamp(path))
+
+
+class CurrencyConverter:
+    """Convertit des colonnes entières, une multiplication vectorisée par devise
+
+    Chaque colonne convertie est mémoïsée par (clé de table, colonne, devise,
+    date des taux) : basculer d'une devise à l'autre ne reconvertit que ce
+    qui n'a jamais été vu. La clé de table doit changer avec les données
+    (ex. version:table).
+    """
+
+    def __init__(self, fx=None, max_entries=256):
+        self.fx = fx or load_rates()
+        self.max_entries = max_entries
+        self._columns = OrderedDict()
+        self._lock = threading.Lock()
+
+    def factors(self, currency, date=None, locations=None):
+        """Scalaire (devise fixe) ou vecteur par ligne (devise locale, PPA)"""
+        if currency not in (LOCAL, PPP):
+            return self.fx.rate(currency, date)
+        if locations is None:
+            # Sans lieu, pas de devise locale : montants laissés en USD
+            return 1.0
+
+        codes, uniques = pd.factorize(locations)
+        per_location = self.fx.location_factors(uniques, currency, date)
+        return np.array([per_location[u] for u in uniques] + [1.0])[codes]
+
+    def _memoized(self, key, compute):
+        with self._lock:
+            if key in self._columns:
+                self._columns.move_to_end(key)
+                return self._columns[key]
+
+        value = compute()
+        with self._lock:
+            self._columns[key] = value
+            while len(self._columns) > self.max_entries:
+                self._columns.popitem(last=False)
+        return value
+
+    def convert_column(self, table_key, column, values, currency, date=None, locations=None):
+        """Colonne en USD convertie ; `locations` n'est lu que pour LOCAL et PPP"""
+        date = self.fx.resolve_date(date)
+        return self._memoized(
+            (table_key, column, currency, date, self.fx.stamp),
+            lambda: np.asarray(values, dtype=float) * self.factors(currency, date, locations)
+        )
+
+    def currency_labels(self, table_key, currency, locations, n_rows):
+        """Devise de chaque ligne après conversion, en catégories"""
+        def compute():
+            if currency == LOCAL and locations is not None:
+                codes, uniques = pd.factorize(locations)
+                labels = [self.fx.currencies.get(loc, self.fx.base) for loc in uniques]
+                categories = pd.unique(pd.Series(labels + [self.fx.base]))
+                label_codes = pd.Index(categories).get_indexer(labels + [self.fx.base])
+                return pd.Categorical.from_codes(label_codes[codes], categories)
+            label = self.fx.base if currency == LOCAL else currency
+            return pd.Categorical.from_codes(np.zeros(n_rows, dtype=np.int8), [label])
+
+        return self._memoized((table_key, 'currency', currency, self.fx.stamp), compute)
+
+    def convert_frame(self, df, table_key, currency, date=None):
+        """Copie de la table, montants convertis et colonne `currency` ajoutée
+
+        Les colonnes converties prennent le suffixe de leur devise
+        (gaming_salary_eur, avg_salary_local...), voir amount_column.
+        """
+        if currency == self.fx.base:
+            return df
+
+        columns = [column for column in SALARY_COLUMNS if column in df.columns]
+        if not columns:
+            return df
+
+        location_column = next((c for c in LOCATION_COLUMNS if c in df.columns), None)
+        locations = df[location_column] if location_column and currency in (LOCAL, PPP) else None
+
+        converted = {
+            column: self.convert_column(table_key, column, df[column], currency, date, locations)
+            for column in columns
+        }
+        converted['currency'] = self.currency_labels(table_key, currency, locations, len(df))
+        return df.assign(**converted).rename(columns={c: amount_column(df, c, currency) for c in columns})
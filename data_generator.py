@@ -8,12 +8,16 @@ import numpy as np
 import json
 from datetime import datetime, timedelta
 import random
+import pyarrow as pa
+import pyarrow.parquet as pq
+from data_sources import table_log
 
 class GamingDataGenerator:
     def __init__(self):
         self.seed = 42
         np.random.seed(self.seed)
         random.seed(self.seed)
+        self.rng = np.random.default_rng(self.seed)
         
         # Données de base réalistes
         self.game_roles = [
@@ -38,6 +42,44 @@ class GamingDataGenerator:
             'China', 'Canada', 'United Kingdom', 'Germany', 'Netherlands'
         ]
 
+        self.experience_levels = ['Junior', 'Mid', 'Senior']
+
+        # Base salaires par expérience
+        self.base_salaries = {
+            'Junior': {'gaming': 65000, 'tech': 75000},
+            'Mid': {'gaming': 95000, 'tech': 110000},
+            'Senior': {'gaming': 135000, 'tech': 155000}
+        }
+
+        # Variation par rôle
+        self.role_multipliers = {
+            'Game Developer': 1.1, 'Game Designer': 0.95, 'Technical Artist': 1.0,
+            'Game Producer': 1.15, 'QA Tester': 0.7, 'Audio Engineer': 0.9,
+            'UI/UX Designer': 1.05, 'Game Animator': 0.95, 'Level Designer': 0.9
+        }
+
+        # Répartition des effectifs d'un studio par rôle et par niveau
+        self.role_weights = {
+            'Game Developer': 0.25, 'Game Designer': 0.10, 'Technical Artist': 0.10,
+            'Game Producer': 0.06, 'QA Tester': 0.15, 'Audio Engineer': 0.04,
+            'UI/UX Designer': 0.08, 'Game Animator': 0.12, 'Level Designer': 0.10
+        }
+        self.level_weights = {'Junior': 0.35, 'Mid': 0.40, 'Senior': 0.25}
+
+        self.country_regions = {
+            'United States': 'North America', 'Canada': 'North America',
+            'France': 'Europe', 'Sweden': 'Europe', 'United Kingdom': 'Europe',
+            'Germany': 'Europe', 'Netherlands': 'Europe', 'Poland': 'Europe',
+            'Japan': 'Asia-Pacific', 'South Korea': 'Asia-Pacific', 'China': 'Asia-Pacific'
+        }
+
+        self.neurodiversity_metrics = [
+            'Innovation Score', 'Problem Solving Speed', 'Employee Retention',
+            'Team Productivity', 'Bug Detection Rate', 'Creative Solutions',
+            'Code Quality', 'Debugging Efficiency', 'Learning Speed',
+            'Attention to Detail'
+        ]
+
     def generate_salary_data(self, num_records=200):
         """Génère des données de salaires gaming vs tech"""
         data = []
@@ -47,12 +89,7 @@ class GamingDataGenerator:
             experience = random.choice(['Junior', 'Mid', 'Senior'])
             region = random.choice(['North America', 'Europe', 'Asia-Pacific'])
             
-            # Base salaires par expérience
-            base_salaries = {
-                'Junior': {'gaming': 65000, 'tech': 75000},
-                'Mid': {'gaming': 95000, 'tech': 110000},
-                'Senior': {'gaming': 135000, 'tech': 155000}
-            }
+            base_salaries = self.base_salaries
             
             # Variation par région
             region_multipliers = {
@@ -61,12 +98,7 @@ class GamingDataGenerator:
                 'Asia-Pacific': 0.75
             }
             
-            # Variation par rôle
-            role_multipliers = {
-                'Game Developer': 1.1, 'Game Designer': 0.95, 'Technical Artist': 1.0,
-                'Game Producer': 1.15, 'QA Tester': 0.7, 'Audio Engineer': 0.9,
-                'UI/UX Designer': 1.05, 'Game Animator': 0.95, 'Level Designer': 0.9
-            }
+            role_multipliers = self.role_multipliers
             
             base_gaming = base_salaries[experience]['gaming']
             base_tech = base_salaries[experience]['tech']
@@ -122,59 +154,220 @@ class GamingDataGenerator:
         
         return pd.DataFrame(studios_data)
 
-    def generate_neurodiversity_data(self):
-        """Génère des données de ROI neurodiversité"""
-        metrics = [
-            'Innovation Score', 'Problem Solving Speed', 'Employee Retention',
-            'Team Productivity', 'Bug Detection Rate', 'Creative Solutions',
-            'Code Quality', 'Debugging Efficiency', 'Learning Speed',
-            'Attention to Detail'
-        ]
+    def iter_employee_chunks(self, studio_data, chunk_size=1_000_000):
+        """Génère les employés individuels par blocs, cohérents avec les effectifs studios
+
+        Chaque bloc est un dict de tableaux numpy (codes studio, rôle, niveau,
+        salaire, ancienneté) couvrant une tranche contiguë d'identifiants.
+        L'ancienneté n'est pas arrondie : elle ne l'est qu'à l'écriture.
+        """
+        roles = list(self.role_weights)
+        role_p = np.array(list(self.role_weights.values()))
+        level_p = np.array([self.level_weights[level] for level in self.experience_levels])
+        role_mult = np.array([self.role_multipliers[role] for role in roles])
+        level_mult = np.array([self.base_salaries[level]['gaming'] for level in self.experience_levels])
+        level_mult = level_mult / self.base_salaries['Mid']['gaming']
+
+        # Le salaire moyen attendu de chaque studio reste son avg_salary_usd
+        norm = (role_p @ role_mult) * (level_p @ level_mult)
+        studio_salary = studio_data['avg_salary_usd'].to_numpy(dtype=np.float64) / norm
+        # Ancienneté exponentielle : P(ancienneté >= 1 an) = taux de rétention
+        retention = studio_data['retention_rate'].to_numpy(dtype=np.float64) / 100
+        studio_tenure = -1 / np.log(retention.clip(0.01, 0.99))
+
+        ends = np.cumsum(studio_data['employees'].to_numpy(dtype=np.int64))
+        total = int(ends[-1]) if len(ends) else 0
+
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            n = stop - start
+            employee_id = np.arange(start, stop, dtype=np.int64)
+            studio = np.searchsorted(ends, employee_id, side='right')
+            role = self.rng.choice(len(roles), size=n, p=role_p).astype(np.int8)
+            level = self.rng.choice(len(level_p), size=n, p=level_p).astype(np.int8)
+            salary = (studio_salary[studio] * role_mult[role] * level_mult[level]
+                      * self.rng.uniform(0.85, 1.15, n))
+            tenure = self.rng.exponential(studio_tenure[studio])
+
+            yield {
+                'employee_id': employee_id,
+                'studio': studio.astype(np.int32),
+                'role': role,
+                'level': level,
+                'salary_usd': salary.astype(np.int32),
+                'tenure_years': tenure
+            }
+
+    def generate_employee_data(self, studio_data, path='gaming_employees.parquet',
+                               chunk_size=1_000_000):
+        """Écrit les employés individuels en Parquet et dérive les agrégats
+
+        Les sommes par studio × rôle × niveau sont accumulées au fil de
+        l'écriture : les tables studios, pays et salaires sont ensuite
+        déduites de ce seul passage groupé.
+        """
+        roles = list(self.role_weights)
+        n_studios, n_roles, n_levels = len(studio_data), len(roles), len(self.experience_levels)
+        n_groups = n_studios * n_roles * n_levels
+        counts = np.zeros(n_groups, dtype=np.int64)
+        salary_sums = np.zeros(n_groups)
+        retained = np.zeros(n_groups, dtype=np.int64)
+
+        dictionaries = {
+            'studio_name': pa.array(studio_data['studio_name'].tolist()),
+            'role': pa.array(roles),
+            'experience_level': pa.array(self.experience_levels)
+        }
+        schema = pa.schema([
+            ('employee_id', pa.int64()),
+            ('studio_name', pa.dictionary(pa.int32(), pa.string())),
+            ('role', pa.dictionary(pa.int8(), pa.string())),
+            ('experience_level', pa.dictionary(pa.int8(), pa.string())),
+            ('salary_usd', pa.int32()),
+            ('tenure_years', pa.float32())
+        ])
+
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in self.iter_employee_chunks(studio_data, chunk_size):
+                group = (chunk['studio'].astype(np.int64) * n_roles + chunk['role']) * n_levels + chunk['level']
+                counts += np.bincount(group, minlength=n_groups)
+                salary_sums += np.bincount(group, weights=chunk['salary_usd'], minlength=n_groups)
+                retained += np.bincount(group[chunk['tenure_years'] >= 1], minlength=n_groups)
+
+                writer.write_table(pa.table([
+                    pa.array(chunk['employee_id']),
+                    pa.DictionaryArray.from_arrays(chunk['studio'], dictionaries['studio_name']),
+                    pa.DictionaryArray.from_arrays(chunk['role'], dictionaries['role']),
+                    pa.DictionaryArray.from_arrays(chunk['level'], dictionaries['experience_level']),
+                    pa.array(chunk['salary_usd']),
+                    pa.array(chunk['tenure_years'].round(1).astype(np.float32))
+                ], schema=schema))
+
+        groups = pd.DataFrame({
+            'studio_name': np.repeat(studio_data['studio_name'].to_numpy(), n_roles * n_levels),
+            'country': np.repeat(studio_data['country'].to_numpy(), n_roles * n_levels),
+            'role': np.tile(np.repeat(roles, n_levels), n_studios),
+            'experience_level': np.tile(self.experience_levels, n_studios * n_roles),
+            'employees': counts,
+            'salary_sum': salary_sums,
+            'retained': retained
+        })
+        groups['region'] = groups['country'].map(self.country_regions).fillna('Other')
+
+        return self.rollup_employee_groups(groups, studio_data)
+
+    def rollup_employee_groups(self, groups, studio_data):
+        """Agrège les sommes studio × rôle × niveau en tables studios, pays et salaires"""
+        sums = ['employees', 'salary_sum', 'retained']
+
+        def finalize(df):
+            employees = df['employees'].where(df['employees'] > 0)
+            df['avg_salary_usd'] = (df['salary_sum'] / employees).round(0)
+            df['retention_rate'] = (df['retained'] / employees * 100).round(1)
+            return df.drop(columns=['salary_sum', 'retained'])
+
+        studios = finalize(groups.groupby(['studio_name', 'country'], sort=False)[sums].sum().reset_index())
+        studios = studios.merge(
+            studio_data[['studio_name', 'neurodiversity_programs']], on='studio_name', how='left'
+        )
+        studios['avg_salary_usd'] = studios['avg_salary_usd'].astype(int)
+
+        countries = finalize(groups.groupby('country', sort=False)[sums].sum().reset_index())
+        countries['studios_count'] = countries['country'].map(studio_data['country'].value_counts())
+
+        salaries = groups.groupby(['role', 'experience_level', 'region'], sort=False)[sums].sum().reset_index()
+        salaries = salaries[salaries['employees'] > 0]
+        tech_premium = salaries['experience_level'].map(
+            {level: base['tech'] / base['gaming'] for level, base in self.base_salaries.items()}
+        )
+        gaming_salary = salaries['salary_sum'] / salaries['employees']
+        salaries = pd.DataFrame({
+            'role': salaries['role'],
+            'experience_level': salaries['experience_level'],
+            'gaming_salary_usd': gaming_salary.astype(int),
+            'tech_salary_usd': (gaming_salary * tech_premium).astype(int),
+            'region': salaries['region'],
+            # Effectif du groupe : les moyennes globales se pondèrent par lui
+            'employees': salaries['employees']
+        }).reset_index(drop=True)
+
+        return {'studios': studios, 'countries': countries, 'salaries': salaries}
+
+    def generate_neurodiversity_teams(self, n_teams=100_000, neurodiverse_share=0.35):
+        """Génère les scores par équipe (une colonne par métrique)"""
+        team_type = np.where(self.rng.random(n_teams) < neurodiverse_share, 'neurodiverse', 'neurotypical')
+        teams = {'team_id': np.arange(n_teams), 'team_type': team_type}
         
-        data = []
-        for metric in metrics:
+        for metric in self.neurodiversity_metrics:
             neurotypical = random.randint(70, 100)
             # Neurodiversité généralement meilleure sauf quelques cas
             if metric in ['Team Productivity', 'Learning Speed']:
-                neurodiverse = int(neurotypical * random.uniform(0.85, 0.95))
+                effect = random.uniform(0.85, 0.95)
             else:
-                neurodiverse = int(neurotypical * random.uniform(1.1, 1.4))
+                effect = random.uniform(1.1, 1.4)
             
-            roi = ((neurodiverse - neurotypical) / neurotypical) * 100
-            
-            data.append({
-                'metric': metric,
-                'neurotypical_teams': neurotypical,
-                'neurodiverse_teams': neurodiverse,
-                'roi_percentage': round(roi, 1)
-            })
+            mean = np.where(team_type == 'neurodiverse', neurotypical * effect, neurotypical)
+            scores = self.rng.normal(mean, neurotypical * 0.15)
+            teams[metric] = np.clip(np.rint(scores), 0, None).astype(int)
         
-        return pd.DataFrame(data)
+        return pd.DataFrame(teams)
+
+    def generate_neurodiversity_data(self, teams=None):
+        """Génère des données de ROI neurodiversité, agrégées depuis les équipes"""
+        if teams is None:
+            teams = self.generate_neurodiversity_teams()
+        
+        means = teams.groupby('team_type')[self.neurodiversity_metrics].mean()
+        data = pd.DataFrame({
+            'metric': self.neurodiversity_metrics,
+            'neurotypical_teams': means.loc['neurotypical'].round().astype(int).to_numpy(),
+            'neurodiverse_teams': means.loc['neurodiverse'].round().astype(int).to_numpy(),
+            'roi_percentage': ((means.loc['neurodiverse'] / means.loc['neurotypical'] - 1) * 100).round(1).to_numpy()
+        })
+        
+        return data
 
-    def generate_all_data(self):
+    def save_workforce_data(self, employee_level=True):
+        """Génère et sauvegarde les tables salaires et studios (et pays)"""
+        if employee_level:
+            # Studios et salaires dérivés des employés individuels
+            rollups = self.generate_employee_data(self.generate_studio_data())
+            rollups['countries'].to_csv('country_aggregates.csv', index=False)
+        else:
+            rollups = {
+                'salaries': self.generate_salary_data(),
+                'studios': self.generate_studio_data()
+            }
+        
+        # Nouvelle base : les deltas de l'ancienne sont abandonnés
+        table_log('salaries').rewrite(rollups['salaries'])
+        table_log('studios').rewrite(rollups['studios'])
+        return rollups
+
+    def save_neurodiversity_data(self):
+        """Génère et sauvegarde les tables neurodiversité (équipes et ROI)"""
+        teams = self.generate_neurodiversity_teams()
+        neurodiversity_data = self.generate_neurodiversity_data(teams)
+        table_log('neurodiversity_teams').rewrite(teams)
+        table_log('neurodiversity').rewrite(neurodiversity_data)
+        return neurodiversity_data
+
+    def generate_all_data(self, employee_level=True):
         """Génère tous les datasets et les sauvegarde"""
         print("🎮 Génération des données Gaming Workforce Observatory...")
         
-        # Génération des datasets
-        salary_data = self.generate_salary_data()
-        studio_data = self.generate_studio_data()
-        neurodiversity_data = self.generate_neurodiversity_data()
-        
-        # Sauvegarde CSV
-        salary_data.to_csv('gaming_salaries.csv', index=False)
-        studio_data.to_csv('global_studios.csv', index=False)
-        neurodiversity_data.to_csv('neurodiversity_roi.csv', index=False)
+        # Génération et sauvegarde des datasets
+        data = self.save_workforce_data(employee_level)
+        data['neurodiversity'] = self.save_neurodiversity_data()
         
         print("✅ Données générées avec succès!")
-        print(f"   - {len(salary_data)} entrées salaires")
-        print(f"   - {len(studio_data)} studios analysés")
-        print(f"   - {len(neurodiversity_data)} métriques neurodiversité")
-        
-        return {
-            'salaries': salary_data,
-            'studios': studio_data,
-            'neurodiversity': neurodiversity_data
-        }
+        if employee_level:
+            print(f"   - {data['studios']['employees'].sum():,} employés individuels")
+        print(f"   - {len(data['salaries'])} entrées salaires")
+        print(f"   - {len(data['studios'])} studios analysés")
+        print(f"   - {len(data['neurodiversity'])} métriques neurodiversité")
+        
+        return data
 
 if __name__ == "__main__":
     generator = GamingDataGenerator()
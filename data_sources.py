@@ -0,0 +1,56 @@
+"""
+🗂️ Gaming Workforce Observatory - Sources de Données
+Localise les tables générées et calcule leur version
+"""
+
+import hashlib
+import os
+
+from delta_log import DeltaLog
+
+# Tables produites par data_generator.py et mises à jour par update_data.py
+DATA_FILES = {
+    'salaries': 'gaming_salaries.csv',
+    'studios': 'global_studios.csv',
+    'neurodiversity': 'neurodiversity_roi.csv',
+    'neurodiversity_teams': 'neurodiversity_teams.csv'
+}
+
+# Clé des deltas par table (None : position de la ligne)
+TABLE_KEYS = {
+    'salaries': None,
+    'studios': 'studio_name',
+    'neurodiversity': 'metric',
+    'neurodiversity_teams': 'team_id'
+}
+
+
+def table_log(name):
+    """Table de base + journal de deltas"""
+    return DeltaLog(DATA_FILES[name], key=TABLE_KEYS[name])
+
+
+def data_version():
+    """Empreinte des fichiers de données (taille + date de modification)
+
+    Un simple stat par fichier : assez bon marché pour être appelé à chaque
+    rerun et change dès qu'une table est régénérée ou mise à jour, y compris
+    par un simple delta ajouté au journal.
+    """
+    digest = hashlib.sha1()
+    for name in sorted(DATA_FILES):
+        for path in table_log(name).paths():
+            try:
+                stat = os.stat(path)
+                digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+            except FileNotFoundError:
+                digest.update(f"{path}:-;".encode())
+    return digest.hexdigest()[:12]
+
+
+def read_table(name):
+    """Charge une table générée (deltas fusionnés), ou None si elle n'existe pas"""
+    log = table_log(name)
+    if not log.exists():
+        return None
+    return log.read()
@@ -0,0 +1,209 @@
+"""
+🧾 Gaming Workforce Observatory - Journal de Deltas
+Écrit les mises à jour ligne à ligne dans un journal append-only,
+fusionné à la lecture et compacté en arrière-plan
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Une seule compaction à la fois par table, dans ce processus
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _table_lock(path):
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(path), threading.RLock())
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+class DeltaLog:
+    """Table CSV de base + journal de deltas (<table>.delta.jsonl)
+
+    Chaque ligne du journal est un lot de modifications : pour chaque
+    colonne modifiée, les clés des lignes et leurs nouvelles valeurs. La
+    clé est une colonne (ex. studio_name) ou, à défaut, la position de la
+    ligne. Les valeurs sont absolues : rejouer un lot est idempotent.
+
+    Un seul processus écrivain est supporté (le cron de mise à jour) ; les
+    lecteurs (l'app) peuvent lire pendant une compaction.
+    """
+
+    def __init__(self, base_path, key=None, compact_threshold=1024 * 1024, rewrite_ratio=0.5):
+        self.base_path = base_path
+        self.key = key
+        self.compact_threshold = compact_threshold
+        self.rewrite_ratio = rewrite_ratio
+        stem = os.path.splitext(base_path)[0]
+        self.log_path = f"{stem}.delta.jsonl"
+        self.compacting_path = f"{stem}.delta.compacting.jsonl"
+        self._lock = _table_lock(base_path)
+        self._compaction = None
+
+    def paths(self):
+        """Fichiers dont dépend le contenu fusionné de la table"""
+        return [self.base_path, self.log_path, self.compacting_path]
+
+    def exists(self):
+        return os.path.exists(self.base_path)
+
+    def _read_log(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def read(self):
+        """Table de base fusionnée avec les deltas en attente"""
+        # Journal, puis journal en compaction, puis base : un delta déjà replié
+        # dans la base peut être relu, jamais perdu (valeurs absolues)
+        pending = self._read_log(self.log_path)
+        compacting = self._read_log(self.compacting_path)
+        base = pd.read_csv(self.base_path)
+        return self._apply(base, compacting + pending)
+
+    def _apply(self, df, batches):
+        if not batches:
+            return df
+
+        keys = df[self.key] if self.key else pd.Series(np.arange(len(df)))
+        updates = {}
+        for batch in batches:
+            for column, (batch_keys, values) in batch['columns'].items():
+                updates.setdefault(column, []).append(pd.DataFrame({'key': batch_keys, 'value': values}))
+
+        # Nouvelles lignes : clés absentes de la base
+        all_keys = pd.concat([u['key'] for parts in updates.values() for u in parts]).drop_duplicates()
+        new_keys = all_keys[~all_keys.isin(keys)]
+        if len(new_keys):
+            new_rows = pd.DataFrame({self.key: new_keys.to_numpy()} if self.key else {}, index=range(len(new_keys)))
+            df = pd.concat([df, new_rows], ignore_index=True)
+            keys = df[self.key] if self.key else pd.Series(np.arange(len(df)))
+
+        index = pd.Index(keys)
+        for column, parts in updates.items():
+            # Dernière valeur par clé, tous lots confondus
+            latest = pd.concat(parts, ignore_index=True).drop_duplicates('key', keep='last')
+            positions = index.get_indexer(latest['key'])
+            values = pd.Series(latest['value'].to_numpy())
+            current = df[column] if column in df else pd.Series(np.nan, index=df.index)
+
+            if pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(values):
+                dtype = np.result_type(current.dtype, values.dtype)
+            else:
+                dtype = object
+            merged = current.to_numpy(dtype=dtype, copy=True)
+            merged[positions] = values.to_numpy(dtype=dtype)
+            df[column] = merged
+        return df
+
+    def changes(self, old, new):
+        """Lot des cellules modifiées entre deux versions de la table"""
+        if len(old) != len(new) or list(old.columns) != list(new.columns):
+            raise ValueError("Les deltas supposent des tables alignées ligne à ligne")
+
+        keys = new[self.key] if self.key else pd.Series(np.arange(len(new)))
+        columns = {}
+        for column in new.columns:
+            if column == self.key:
+                continue
+            differs = old[column].to_numpy() != new[column].to_numpy()
+            differs &= ~(old[column].isna().to_numpy() & new[column].isna().to_numpy())
+            if differs.any():
+                columns[column] = (
+                    [_to_json(k) for k in keys[differs]],
+                    [_to_json(v) for v in new[column][differs]]
+                )
+        return columns
+
+    def write_changes(self, old, new):
+        """Enregistre les modifications old -> new ; coût proportionnel au delta
+
+        Si la majorité des lignes changent, la base est réécrite directement.
+        """
+        columns = self.changes(old, new)
+        if not columns:
+            return 0
+
+        changed_rows = len({k for keys, _ in columns.values() for k in keys})
+        if changed_rows >= self.rewrite_ratio * max(len(new), 1):
+            self.rewrite(new)
+            return changed_rows
+
+        line = json.dumps({'ts': datetime.now().isoformat(timespec='seconds'), 'columns': columns},
+                          ensure_ascii=False)
+        with self._lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            log_size = os.path.getsize(self.log_path)
+
+        if log_size >= self.compact_threshold:
+            self.compact_async()
+        return changed_rows
+
+    def rewrite(self, df):
+        """Remplace la base par une table complète et vide le journal"""
+        # Attente hors verrou : la compaction en cours a besoin de ce verrou
+        self.wait()
+        with self._lock:
+            self._write_base(df)
+            for path in (self.log_path, self.compacting_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _write_base(self, df):
+        tmp_path = f"{self.base_path}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.base_path)
+
+    def compact(self):
+        """Replie le journal dans la base"""
+        with self._lock:
+            if not os.path.exists(self.compacting_path):
+                if not os.path.exists(self.log_path):
+                    return False
+                # Les nouveaux deltas partent dans un journal neuf
+                os.replace(self.log_path, self.compacting_path)
+
+            base = pd.read_csv(self.base_path)
+            merged = self._apply(base, self._read_log(self.compacting_path))
+            self._write_base(merged)
+            os.remove(self.compacting_path)
+        return True
+
+    def compact_async(self):
+        """Lance la compaction sur un thread d'arrière-plan"""
+        if self._compaction is not None and self._compaction.is_alive():
+            return self._compaction
+
+        def run():
+            try:
+                if self.compact():
+                    print(f"🧾 Journal compacté dans {self.base_path}")
+            except Exception as e:
+                print(f"❌ Erreur compaction {self.base_path}: {e}")
+
+        self._compaction = threading.Thread(target=run, name=f'compact-{self.base_path}')
+        self._compaction.start()
+        return self._compaction
+
+    def wait(self):
+        """Attend la fin d'une compaction en cours"""
+        if self._compaction is not None and self._compaction is not threading.current_thread():
+            self._compaction.join()
@@ -0,0 +1,209 @@
+"""
+📥 Gaming Workforce Observatory - Export en Flux
+Encode une table bloc par bloc (CSV ou Parquet), compressée à la volée,
+pour une mémoire constante quelle que soit la taille de l'export
+"""
+
+import argparse
+import io
+import os
+import sys
+import zlib
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_sources import DATA_FILES, read_table
+
+# Formats d'export : extension, type MIME et compressions proposées
+FORMATS = {
+    'csv': {'extension': 'csv', 'mime': 'text/csv', 'compressions': [None, 'gzip']},
+    'parquet': {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet',
+                'compressions': [None, 'snappy', 'zstd', 'gzip']}
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Fichier en écriture seule vidé après chaque bloc encodé"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_chunks(source, chunk_rows=50_000, columns=None, query=None):
+    """Blocs de DataFrame depuis une table en mémoire ou un itérable de blocs
+
+    `columns` restreint les colonnes, `query` filtre chaque bloc
+    (syntaxe DataFrame.query).
+    """
+    if isinstance(source, pd.DataFrame):
+        frame = source
+        source = (frame.iloc[start:start + chunk_rows] for start in range(0, max(len(frame), 1), chunk_rows))
+
+    for chunk in source:
+        if query:
+            chunk = chunk.query(query)
+        if columns:
+            chunk = chunk[columns]
+        yield chunk
+
+
+def iter_csv(chunks):
+    """CSV encodé bloc par bloc, en-tête une seule fois"""
+    header = True
+    for chunk in chunks:
+        if header or len(chunk):
+            yield chunk.to_csv(index=False, header=header).encode('utf-8')
+            header = False
+
+
+def iter_parquet(chunks, compression=None):
+    """Parquet : un row group par bloc, octets rendus dès qu'ils sont écrits"""
+    sink = _ChunkSink()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema, compression=compression or 'none')
+        elif not table.schema.equals(writer.schema):
+            # Un bloc entièrement vide peut inférer un type null
+            table = table.cast(writer.schema)
+        writer.write_table(table)
+        yield sink.drain()
+
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def gzip_stream(blocks, level=6):
+    """Compression gzip à la volée d'un flux d'octets"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_export(source, fmt='csv', compression=None, chunk_rows=50_000, columns=None, query=None):
+    """Octets de l'export, produits bloc par bloc"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu: {fmt} (attendu : {', '.join(FORMATS)})")
+    if compression not in FORMATS[fmt]['compressions']:
+        raise ValueError(f"Compression {compression} non disponible en {fmt}")
+
+    chunks = iter_chunks(source, chunk_rows, columns, query)
+    if fmt == 'parquet':
+        # Parquet compresse chaque page lui-même
+        return iter_parquet(chunks, compression)
+
+    blocks = iter_csv(chunks)
+    return gzip_stream(blocks) if compression == 'gzip' else blocks
+
+
+def export_file_name(name, fmt='csv', compression=None):
+    """Nom du fichier exporté, ex. gaming_salaries.csv.gz"""
+    file_name = f"{name}.{FORMATS[fmt]['extension']}"
+    if fmt == 'csv' and compression == 'gzip':
+        file_name += '.gz'
+    return file_name
+
+
+def export_mime(fmt='csv', compression=None):
+    """Type MIME du fichier exporté"""
+    if fmt == 'csv' and compression == 'gzip':
+        return 'application/gzip'
+    return FORMATS[fmt]['mime']
+
+
+def write_export(source, fileobj, **options):
+    """Écrit l'export dans un fichier ouvert, renvoie le nombre d'octets"""
+    written = 0
+    for block in iter_export(source, **options):
+        fileobj.write(block)
+        written += len(block)
+    return written
+
+
+def export_bytes(source, **options):
+    """Export complet en octets, pour un téléchargement généré au clic
+
+    Encodé bloc par bloc, mais le résultat est tenu entier en mémoire :
+    pour un export de taille quelconque, préférer write_export vers un fichier.
+    """
+    buffer = io.BytesIO()
+    write_export(source, buffer, **options)
+    return buffer.getvalue()
+
+
+def iter_source(name, chunk_rows=50_000):
+    """Blocs d'une table du projet ou d'un fichier CSV/Parquet, sans tout charger
+
+    Les tables à journal de deltas sont fusionnées (elles restent petites) ;
+    les autres fichiers sont lus bloc par bloc.
+    """
+    if name in DATA_FILES:
+        table = read_table(name)
+        if table is None:
+            raise FileNotFoundError(DATA_FILES[name])
+        return table
+
+    if name.endswith('.parquet'):
+        parquet = pq.ParquetFile(name)
+        return (batch.to_pandas() for batch in parquet.iter_batches(batch_size=chunk_rows))
+    return pd.read_csv(name, chunksize=chunk_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export en flux d'une table Gaming Workforce Observatory")
+    parser.add_argument('table', help=f"table ({', '.join(DATA_FILES)}) ou fichier .csv/.parquet")
+    parser.add_argument('--format', choices=list(FORMATS), default='csv')
+    parser.add_argument('--compression', help="gzip (CSV) ; snappy, zstd ou gzip (Parquet)")
+    parser.add_argument('--columns', help="colonnes à exporter, séparées par des virgules")
+    parser.add_argument('--query', help="filtre, ex. \"experience_level == 'Senior'\"")
+    parser.add_argument('--chunk-rows', type=int, default=50_000)
+    parser.add_argument('--output', help="fichier de sortie (défaut : nom déduit, '-' pour stdout)")
+    args = parser.parse_args()
+
+    name = os.path.splitext(os.path.basename(args.table))[0]
+    output = args.output or export_file_name(name, args.format, args.compression)
+    options = {
+        'fmt': args.format,
+        'compression': args.compression,
+        'chunk_rows': args.chunk_rows,
+        'columns': args.columns.split(',') if args.columns else None,
+        'query': args.query
+    }
+
+    source = iter_source(args.table, args.chunk_rows)
+    if output == '-':
+        write_export(source, sys.stdout.buffer, **options)
+        return
+
+    with open(output, 'wb') as f:
+        written = write_export(source, f, **options)
+    print(f"📥 Export {output} ({written / 1024 / 1024:.1f} Mo)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
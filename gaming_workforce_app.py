@@ -4,6 +4,15 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+from workforce_projection import WorkforceProjector
+from data_sources import DATA_FILES, data_version, read_table
+from cache_warmup import CacheWarmer
+from metrics_snapshot import MetricsSnapshot, average_salary, live_kpis
+from paged_table import paged_dataframe
+from roi_bootstrap import RoiBootstrap
+from export import FORMATS, export_file_name, export_mime, export_bytes
+from search_index import build_index
+from currency import BASE, LOCAL, PPP, CurrencyConverter, amount_column, frame_unit, fx_stamp, load_rates
 
 # Configuration de la page
 st.set_page_config(
@@ -38,9 +47,14 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Versions des données gardées en cache : la servie, la précédente, celle en préchauffage
+CACHED_VERSIONS = 3
+# Variantes mises en cache par version (devise × date des taux, filtre de recherche, paramètres)
+VIEWS_PER_VERSION = 16
+
 # Chargement des données
-@st.cache_data
-def load_data():
+@st.cache_data(max_entries=CACHED_VERSIONS)
+def load_data(version):
     # Données de salaires
     gaming_salaries = [
         {"role": "Game Developer", "experience_level": "Junior", "gaming_salary_usd": 79799, "tech_salary_usd": 85000, "region": "North America"},
@@ -110,7 +124,7 @@ def load_data():
         {"year": 2024, "global_revenue_billion": 200.0, "total_employees_k": 355, "avg_gaming_salary": 124000, "layoffs_k": 8.3}
     ]
 
-    return {
+    data = {
         'salaries': pd.DataFrame(gaming_salaries),
         'studios': pd.DataFrame(global_studios),
         'neurodiversity': pd.DataFrame(neurodiversity_roi),
@@ -118,6 +132,453 @@ def load_data():
         'evolution': pd.DataFrame(industry_evolution)
     }
 
+    # Les tables générées par data_generator.py / update_data.py priment
+    for name in DATA_FILES:
+        table = read_table(name)
+        if table is not None:
+            data[name] = table
+
+    return data
+
+@st.cache_resource(max_entries=2)
+def get_converter(rates_stamp):
+    # Colonnes converties mémoïsées entre sessions, tant que le fichier de taux ne change pas
+    return CurrencyConverter(load_rates())
+
+def load_view(version, currency=BASE, rate_date=None):
+    # Tables avec les montants dans la devise affichée
+    data = load_data(version)
+    if currency == BASE:
+        return data
+    converter = get_converter(fx_stamp())
+    return {name: converter.convert_frame(table, f"{version}:{name}", currency, rate_date)
+            for name, table in data.items()}
+
+def salary_label(table, currency):
+    return f"Salaire ({frame_unit(table, currency)})"
+
+def local_keys(currency):
+    # En devise locale, les montants ne se moyennent qu'à devise égale
+    return ['currency'] if currency == LOCAL else []
+
+# Calculs et graphiques de chaque page, mis en cache par version des données
+@st.cache_data(max_entries=CACHED_VERSIONS * VIEWS_PER_VERSION)
+def build_dashboard(version, currency=BASE, rate_date=None):
+    data = load_view(version, currency, rate_date)
+
+    fig_revenue = px.line(data['evolution'], x='year', y='global_revenue_billion', 
+                         title='Revenus Globaux (Milliards $)',
+                         color_discrete_sequence=['#667eea'])
+    fig_revenue.update_layout(showlegend=False)
+
+    salary = amount_column(data['evolution'], 'avg_gaming_salary', currency)
+    fig_salary = px.bar(data['evolution'], x='year', y=salary,
+                        title='Évolution Salaire Moyen Gaming',
+                        labels={salary: salary_label(data['evolution'], currency)},
+                        color_discrete_sequence=['#764ba2'])
+    fig_salary.update_layout(showlegend=False)
+
+    return {
+        'fig_revenue': fig_revenue,
+        'fig_salary': fig_salary
+    }
+
+@st.cache_data(max_entries=CACHED_VERSIONS)
+def compute_kpis(version):
+    data = load_data(version)
+    return live_kpis(data['salaries'], data['studios'])
+
+def load_kpis(version, currency=BASE, rate_date=None):
+    # Snapshot matérialisé par update_data.py, calcul direct s'il est périmé
+    snapshot = MetricsSnapshot().load()
+    if snapshot.is_fresh(version):
+        kpis, source = snapshot.kpis(), f"snapshot du {snapshot.state['updated_at']}"
+    else:
+        kpis, source = compute_kpis(version), "calcul direct"
+
+    # Le snapshot est en USD : seul le salaire moyen change de devise
+    if currency not in (BASE, LOCAL):
+        salaries = load_view(version, currency, rate_date)['salaries']
+        kpis = dict(kpis, avg_salary=average_salary(salaries, amount_column(salaries, 'gaming_salary_usd', currency)))
+    return kpis, source
+
+@st.cache_data(max_entries=CACHED_VERSIONS * VIEWS_PER_VERSION)
+def build_talent_wars(version, roles=(), currency=BASE, rate_date=None):
+    data = load_view(version, currency, rate_date)
+    salaries = data['salaries']
+    if roles:
+        salaries = salaries[salaries['role'].isin(roles)]
+
+    # Comparaison salaires
+    gaming = amount_column(salaries, 'gaming_salary_usd', currency)
+    tech = amount_column(salaries, 'tech_salary_usd', currency)
+    salary_comparison = salaries.copy()
+    salary_comparison['salary_gap'] = salary_comparison[tech] - salary_comparison[gaming]
+    salary_comparison['gap_percentage'] = (salary_comparison['salary_gap'] / salary_comparison[gaming]) * 100
+
+    fig_levels = px.bar(salary_comparison, x='experience_level', y=[gaming, tech],
+                        title="Comparaison Salaires par Niveau d'Expérience",
+                        facet_col='currency' if currency == LOCAL else None,
+                        labels={'value': salary_label(salaries, currency)},
+                        barmode='group', color_discrete_sequence=['#ff6b6b', '#4ecdc4'])
+    if currency == LOCAL:
+        fig_levels.update_yaxes(matches=None, showticklabels=True)
+
+    avg_gap = salary_comparison.groupby('role').agg({
+        'gap_percentage': 'mean',
+        'salary_gap': 'mean'
+    }).reset_index()
+
+    fig_gap = px.bar(avg_gap, x='role', y='gap_percentage',
+                     title='Écart Salarial Moyen par Rôle (%)',
+                     color_discrete_sequence=['#ff9f43'])
+    fig_gap.update_xaxes(tickangle=45)
+
+    # Tableau détaillé
+    detailed_analysis = salary_comparison.groupby(['role', 'experience_level'] + local_keys(currency), observed=True).agg({
+        gaming: 'mean',
+        tech: 'mean',
+        'salary_gap': 'mean',
+        'gap_percentage': 'mean'
+    }).round(0).reset_index()
+
+    return {
+        'fig_levels': fig_levels,
+        'fig_gap': fig_gap,
+        'detailed_analysis': detailed_analysis,
+        'salaries': salaries
+    }
+
+@st.cache_data(max_entries=CACHED_VERSIONS * VIEWS_PER_VERSION)
+def build_studios(version, studio_names=(), currency=BASE, rate_date=None):
+    data = load_view(version, currency, rate_date)
+    studios = data['studios']
+    if studio_names:
+        studios = studios[studios['studio_name'].isin(studio_names)]
+
+    salary = amount_column(studios, 'avg_salary_usd', currency)
+    fig_scatter = px.scatter(studios, x=salary, y='retention_rate', 
+                             size='employees', hover_name='studio_name',
+                             labels={salary: salary_label(studios, currency)},
+                             color='country', title='Salaire vs Rétention (Taille = Employés)',
+                             size_max=50)
+
+    top_studios = studios.nlargest(8, 'employees')
+    fig_top = px.bar(top_studios, x='employees', y='studio_name',
+                     title="Top Studios par Nombre d'Employés",
+                     orientation='h', color_discrete_sequence=['#667eea'])
+
+    # Analyse par pays
+    country_analysis = studios.groupby(['country'] + local_keys(currency), observed=True).agg({
+        'employees': 'sum',
+        salary: 'mean',
+        'retention_rate': 'mean',
+        'neurodiversity_programs': 'sum'
+    }).round(0).reset_index()
+
+    fig_countries = px.pie(country_analysis, values='employees', names='country',
+                           title='Répartition Employés par Pays')
+
+    fig_country_salary = px.bar(country_analysis, x='country', y=salary,
+                                title='Salaire Moyen par Pays',
+                                hover_data=local_keys(currency),
+                                labels={salary: salary_label(studios, currency)},
+                                color_discrete_sequence=['#ff6b6b'])
+    fig_country_salary.update_xaxes(tickangle=45)
+
+    return {
+        'fig_scatter': fig_scatter,
+        'fig_top': fig_top,
+        'fig_countries': fig_countries,
+        'fig_country_salary': fig_country_salary,
+        'country_analysis': country_analysis,
+        'studios': studios
+    }
+
+@st.cache_data(max_entries=CACHED_VERSIONS * VIEWS_PER_VERSION)
+def project_studios(version, n_quarters, n_simulations):
+    projector = WorkforceProjector(n_simulations=n_simulations, n_quarters=n_quarters)
+    return projector.project(load_data(version)['studios'])
+
+# Libellés des insights neurodiversité : emoji, métrique, constat
+NEURODIVERSITY_INSIGHTS = {
+    'Innovation Score': ("🚀", "Innovation", "Les équipes neurodiverses montrent une innovation supérieure"),
+    'Problem Solving Speed': ("⚡", "Résolution problèmes", "Vitesse de résolution de problèmes considérablement améliorée"),
+    'Bug Detection Rate': ("🎯", "Détection bugs", "Capacité supérieure à identifier les anomalies"),
+    'Creative Solutions': ("🎨", "Solutions créatives", "Approches créatives significativement plus développées"),
+    'Employee Retention': ("👥", "Rétention", "Meilleure fidélisation des employés neurodiverses"),
+    'Debugging Efficiency': ("🔧", "Efficacité débogage", "Débogage plus rapide et plus méthodique"),
+    'Attention to Detail': ("🔍", "Attention aux détails", "Précision accrue sur les tâches exigeantes"),
+    'Code Quality': ("🧹", "Qualité du code", "Code plus robuste et mieux relu"),
+    'Team Productivity': ("🤝", "Productivité équipe", "Productivité collective plus élevée"),
+    'Learning Speed': ("📚", "Vitesse d'apprentissage", "Montée en compétences plus rapide")
+}
+
+@st.cache_data(max_entries=CACHED_VERSIONS)
+def roi_intervals(version):
+    """ROI par métrique et intervalle de confiance bootstrap à 95%
+
+    Calculé à partir des scores par équipe quand ils existent ; sinon, ROI
+    de la table agrégée sans intervalle.
+    """
+    data = load_data(version)
+    if 'neurodiversity_teams' not in data:
+        return data['neurodiversity'][['metric', 'roi_percentage']].assign(ci_low=np.nan, ci_high=np.nan)
+    return RoiBootstrap().intervals(data['neurodiversity_teams'])
+
+def roi_insights(intervals, limit=5):
+    """Insights clés tirés des ROI : meilleurs gains, puis points de vigilance"""
+    insights = []
+    ranked = intervals.sort_values('roi_percentage', ascending=False)
+
+    for row in ranked.itertuples():
+        emoji, label, finding = NEURODIVERSITY_INSIGHTS.get(row.metric, ("📊", row.metric, ""))
+        has_ci = not np.isnan(row.ci_low)
+        ci = f" (IC 95% : {row.ci_low:+.1f}% à {row.ci_high:+.1f}%)" if has_ci else ""
+        significant = not has_ci or row.ci_low > 0 or row.ci_high < 0
+
+        if row.roi_percentage > 0 and len(insights) < limit:
+            text = finding if significant else "Effet non significatif, l'intervalle inclut 0"
+            insights.append(f"{emoji} **{label} {row.roi_percentage:+.0f}%**{ci} : {text}")
+        elif row.roi_percentage < 0 and significant:
+            insights.append(f"⚠️ **{label} {row.roi_percentage:+.0f}%**{ci} : "
+                            f"point de vigilance, accompagnement à prévoir")
+
+    return insights
+
+@st.cache_data(max_entries=CACHED_VERSIONS)
+def build_neurodiversity(version):
+    data = load_data(version)
+    intervals = roi_intervals(version)
+
+    fig_neurotypical = px.bar(data['neurodiversity'], x='neurotypical_teams', y='metric',
+                              orientation='h', title='Performance Équipes Neurotypiques',
+                              color_discrete_sequence=['#95a5a6'])
+
+    fig_neurodiverse = px.bar(data['neurodiversity'], x='neurodiverse_teams', y='metric',
+                              orientation='h', title='Performance Équipes Neurodiverses',
+                              color_discrete_sequence=['#3498db'])
+
+    colors = ['green' if x > 0 else 'red' for x in intervals['roi_percentage']]
+    fig_roi = px.bar(intervals.assign(error_plus=intervals['ci_high'] - intervals['roi_percentage'],
+                                      error_minus=intervals['roi_percentage'] - intervals['ci_low']),
+                     x='metric', y='roi_percentage', error_y='error_plus', error_y_minus='error_minus',
+                     title='ROI par Métrique (%) - IC 95% bootstrap', color=colors,
+                     color_discrete_map={'green': '#27ae60', 'red': '#e74c3c'})
+    fig_roi.update_xaxes(tickangle=45)
+
+    # Radar chart
+    fig_radar = go.Figure()
+
+    fig_radar.add_trace(go.Scatterpolar(
+        r=data['neurodiversity']['neurotypical_teams'],
+        theta=data['neurodiversity']['metric'],
+        fill='toself',
+        name='Équipes Neurotypiques',
+        line_color='rgba(149, 165, 166, 0.8)'
+    ))
+
+    fig_radar.add_trace(go.Scatterpolar(
+        r=data['neurodiversity']['neurodiverse_teams'],
+        theta=data['neurodiversity']['metric'],
+        fill='toself',
+        name='Équipes Neurodiverses',
+        line_color='rgba(52, 152, 219, 0.8)'
+    ))
+
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 150]
+            )),
+        showlegend=True,
+        title="Comparaison Performance - Radar"
+    )
+
+    return {
+        'fig_neurotypical': fig_neurotypical,
+        'fig_neurodiverse': fig_neurodiverse,
+        'fig_roi': fig_roi,
+        'fig_radar': fig_radar,
+        'insights': roi_insights(intervals)
+    }
+
+@st.cache_data(max_entries=CACHED_VERSIONS * VIEWS_PER_VERSION)
+def build_compensation(version, currency=BASE, rate_date=None):
+    data = load_view(version, currency, rate_date)
+    unit = frame_unit(data['evolution'], currency)
+    salary = amount_column(data['evolution'], 'avg_gaming_salary', currency)
+
+    # Évolution temporelle
+    fig_evolution = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Revenus Globaux', 'Employés Totaux', 'Salaire Moyen', 'Licenciements'),
+        vertical_spacing=0.12
+    )
+
+    fig_evolution.add_trace(
+        go.Scatter(x=data['evolution']['year'], y=data['evolution']['global_revenue_billion'],
+                  name='Revenus (Mds $)', line=dict(color='#667eea')),
+        row=1, col=1
+    )
+
+    fig_evolution.add_trace(
+        go.Scatter(x=data['evolution']['year'], y=data['evolution']['total_employees_k'],
+                  name='Employés (K)', line=dict(color='#764ba2')),
+        row=1, col=2
+    )
+
+    fig_evolution.add_trace(
+        go.Scatter(x=data['evolution']['year'], y=data['evolution'][salary],
+                  name=f'Salaire Moyen ({unit})', line=dict(color='#f093fb')),
+        row=2, col=1
+    )
+
+    fig_evolution.add_trace(
+        go.Bar(x=data['evolution']['year'], y=data['evolution']['layoffs_k'],
+               name='Licenciements (K)', marker_color='#ff6b6b'),
+        row=2, col=2
+    )
+
+    fig_evolution.update_layout(height=600, showlegend=False, title_text="Évolution de l'Industrie Gaming (2020-2024)")
+
+    # Distribution des salaires
+    gaming = amount_column(data['salaries'], 'gaming_salary_usd', currency)
+    labels = {gaming: salary_label(data['salaries'], currency)}
+    fig_distribution = px.box(data['salaries'], x='role', y=gaming,
+                              title='Distribution Salaires Gaming', labels=labels,
+                              color='currency' if currency == LOCAL else None,
+                              color_discrete_sequence=None if currency == LOCAL else ['#667eea'])
+    fig_distribution.update_xaxes(tickangle=45)
+
+    avg_by_role = data['salaries'].groupby(['role'] + local_keys(currency), observed=True)[gaming].mean().reset_index()
+    fig_by_role = px.bar(avg_by_role, x='role', y=gaming,
+                         title='Salaire Moyen par Rôle', labels=labels,
+                         color='currency' if currency == LOCAL else None, barmode='group',
+                         color_discrete_sequence=None if currency == LOCAL else ['#764ba2'])
+    fig_by_role.update_xaxes(tickangle=45)
+
+    return {
+        'fig_evolution': fig_evolution,
+        'fig_distribution': fig_distribution,
+        'fig_by_role': fig_by_role
+    }
+
+@st.cache_data(max_entries=CACHED_VERSIONS)
+def build_retention(version):
+    data = load_data(version)
+
+    # Bubble chart efficacité vs adoption
+    fig_bubble = px.scatter(data['retention'], x='effectiveness_score', y='gaming_adoption_rate',
+                            size='effectiveness_score', hover_name='strategy',
+                            title='Efficacité vs Adoption dans le Gaming',
+                            color='implementation_cost',
+                            color_discrete_map={'High': '#e74c3c', 'Medium': '#f39c12', 'Low': '#27ae60'})
+
+    fig_effectiveness = px.bar(data['retention'], x='strategy', y='effectiveness_score',
+                               title="Score d'Efficacité par Stratégie",
+                               color='implementation_cost',
+                               color_discrete_map={'High': '#e74c3c', 'Medium': '#f39c12', 'Low': '#27ae60'})
+    fig_effectiveness.update_xaxes(tickangle=45)
+
+    # Matrice de recommandations
+    retention_analysis = data['retention'].copy()
+    retention_analysis['cost_score'] = retention_analysis['implementation_cost'].map({'Low': 3, 'Medium': 2, 'High': 1})
+    retention_analysis['recommendation_score'] = (retention_analysis['effectiveness_score'] * 0.4 + 
+                                                 retention_analysis['gaming_adoption_rate'] * 0.3 + 
+                                                 retention_analysis['cost_score'] * 30) / 100 * 100
+
+    strategy_ranking = retention_analysis[['strategy', 'effectiveness_score', 'implementation_cost', 'gaming_adoption_rate', 'recommendation_score']]
+
+    return {
+        'fig_bubble': fig_bubble,
+        'fig_effectiveness': fig_effectiveness,
+        'strategy_ranking': strategy_ranking.round(1)
+    }
+
+# Taille maximale d'un export depuis l'app (le fichier y est tenu en mémoire)
+EXPORT_MAX_ROWS = 500_000
+
+# Score minimal d'une correspondance pour filtrer les pages Studios et Talent Wars
+FILTER_MIN_SCORE = 0.5
+
+# Paramètres par défaut des projections Monte Carlo
+DEFAULT_PROJECTION = {'n_quarters': 8, 'n_simulations': 10000}
+
+def default_view():
+    # Devise et date des taux des sélecteurs par défaut : le préchauffage doit
+    # appeler les pages avec les mêmes arguments, sinon st.cache_data le rate
+    return BASE, load_rates().dates()[-1]
+
+# Ordre de préchauffage : page par défaut d'abord
+WARMUP_TASKS = [
+    ("🏠 Dashboard Principal", lambda version: build_dashboard(version, *default_view())),
+    ("📊 KPIs", compute_kpis),
+    ("⚔️ Talent Wars: Gaming vs Tech", lambda version: build_talent_wars(version, (), *default_view())),
+    ("🌍 Studios Globaux", lambda version: build_studios(version, (), *default_view())),
+    ("🔮 Projections Studios", lambda version: project_studios(version, DEFAULT_PROJECTION['n_quarters'], DEFAULT_PROJECTION['n_simulations'])),
+    ("🧠 Neurodiversité & ROI", build_neurodiversity),
+    ("💰 Analyse Compensation", lambda version: build_compensation(version, *default_view())),
+    ("🎯 Stratégies Rétention", build_retention),
+    ("🔎 Index de recherche", lambda version: get_search_index(version))
+]
+
+@st.cache_resource(max_entries=4)
+def get_search_index(version):
+    # Index trigrammes partagé entre sessions, reconstruit à chaque version
+    data = load_data(version)
+    return build_index(data['studios'], data['salaries'])
+
+@st.cache_resource
+def get_cache_warmer():
+    # Un seul préchauffeur par processus, lancé au démarrage du serveur
+    # Le premier visiteur n'attend que la page par défaut et ses KPIs
+    return CacheWarmer(WARMUP_TASKS, data_version, priority=2).start()
+
+def export_panel(tables, key):
+    """Export de la table choisie, encodé au clic seulement
+
+    Le fichier produit est gardé entier en mémoire le temps du
+    téléchargement : compressé par défaut et limité à EXPORT_MAX_ROWS
+    lignes. Au-delà, seul export.py (ligne de commande) écrit en flux.
+    """
+    with st.expander("📥 Exporter les données"):
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            name = st.selectbox("Table", list(tables), key=f"{key}_export_table")
+        with col2:
+            fmt = st.selectbox("Format", list(FORMATS), format_func=str.upper, key=f"{key}_export_format")
+        with col3:
+            # Première compression disponible par défaut : fichier en mémoire plus petit
+            compression = st.selectbox("Compression", FORMATS[fmt]['compressions'], index=1,
+                                       format_func=lambda c: c or "Aucune",
+                                       key=f"{key}_export_compression_{fmt}")
+
+        table = tables[name]
+        file_name = export_file_name(name, fmt, compression)
+        if len(table) > EXPORT_MAX_ROWS:
+            st.warning(f"{len(table):,} lignes : au-delà de {EXPORT_MAX_ROWS:,}, exportez en flux avec "
+                       f"`python export.py <table> --format {fmt}` (fichier en mémoire sinon)")
+            return
+        st.download_button(
+            f"⬇️ {file_name} ({len(table):,} lignes)",
+            data=lambda: export_bytes(table, fmt=fmt, compression=compression),
+            file_name=file_name,
+            mime=export_mime(fmt, compression),
+            key=f"{key}_export_download"
+        )
+        st.caption("Fichier préparé en mémoire au clic ; pour de gros volumes, utilisez `python export.py`.")
+
+def search_notice(query, matches, noun, shown=5):
+    """Rappelle le filtre de recherche appliqué à la page"""
+    if matches:
+        listed = ', '.join(matches[:shown]) + (", …" if len(matches) > shown else "")
+        st.info(f"🔎 Filtré sur {len(matches)} {noun}(s) : {listed}")
+    elif query:
+        st.info(f"🔎 Aucun {noun} ne correspond à « {query} », affichage complet")
+
 # Header principal
 st.markdown("""
 <div class="main-header">
@@ -131,7 +592,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Chargement des données
-data = load_data()
+# Version servie : la dernière préchauffée, la nouvelle dès que son cache est prêt
+warmer = get_cache_warmer()
+version = warmer.serve(data_version())
+data = load_data(version)
 
 # Sidebar pour navigation
 st.sidebar.markdown("## 🎮 Navigation")
@@ -141,25 +605,73 @@ page = st.sidebar.selectbox(
      "🧠 Neurodiversité & ROI", "💰 Analyse Compensation", "🎯 Stratégies Rétention"]
 )
 
+# Recherche floue studios / rôles, filtre les pages Studios et Talent Wars
+search_query = st.sidebar.text_input("🔎 Rechercher un studio ou un rôle", key="search_query")
+matched_studios, matched_roles = (), ()
+if search_query:
+    search_index = get_search_index(version)
+    # Filtres : toutes les correspondances au-dessus du seuil, par type ;
+    # la barre latérale n'affiche que les meilleures
+    matched_studios, matched_roles = (
+        tuple(hit['label'] for hit in search_index.search(search_query, limit=None,
+                                                          min_score=FILTER_MIN_SCORE, kind=kind))
+        for kind in ('studio', 'role')
+    )
+    hits = search_index.search(search_query, limit=8)
+    icons = {'studio': '🏢', 'role': '👔'}
+    for hit in hits:
+        st.sidebar.caption(f"{icons[hit['kind']]} {hit['label']} · {hit['score']:.0%}")
+    if not hits:
+        st.sidebar.caption("Aucun studio ni rôle ne correspond")
+
+# Devise d'affichage des montants (stockés en USD)
+fx = load_rates()
+currency_names = {LOCAL: "Devise locale", PPP: "Parité de pouvoir d'achat (PPA)"}
+col1, col2 = st.sidebar.columns(2)
+with col1:
+    currency = st.selectbox("💱 Devise", fx.codes() + [LOCAL, PPP],
+                            format_func=lambda c: currency_names.get(c, c), key="currency")
+with col2:
+    rate_date = st.selectbox("Taux au", fx.dates()[::-1], key="rate_date",
+                             disabled=currency == BASE)
+view = load_view(version, currency, rate_date)
+
+# État du préchauffage du cache
+with st.sidebar.expander("🔥 Préchauffage du cache"):
+    warmup = warmer.progress()
+    states = {'idle': 'En attente', 'running': 'En cours', 'done': 'Terminé', 'failed': 'Erreurs'}
+    st.progress(warmup['done'] / max(warmup['total'], 1),
+                text=f"{states[warmup['state']]} - {warmup['done']}/{warmup['total']} pages")
+    st.caption(f"Version des données : {warmup['version']} · affichée : {version}")
+    if warmup['timings']:
+        st.dataframe(pd.DataFrame({
+            'page': list(warmup['timings']),
+            'durée (s)': [round(t, 3) for t in warmup['timings'].values()]
+        }), hide_index=True)
+    for name, error in warmup['errors'].items():
+        st.error(f"{name} : {error}")
+
 if page == "🏠 Dashboard Principal":
     st.markdown("### 📊 Métriques Clés de l'Industrie Gaming")
 
     # Calculs des métriques
-    total_employees = data['studios']['employees'].sum()
-    avg_salary = data['salaries']['gaming_salary_usd'].mean()
-    studios_count = len(data['studios'])
-    avg_retention = data['studios']['retention_rate'].mean()
+    kpis, kpis_source = load_kpis(version, currency, rate_date)
+    dashboard = build_dashboard(version, currency, rate_date)
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("Total Employés", f"{total_employees:,}", "355K+ dans l'industrie")
+        st.metric("Total Employés", f"{kpis['total_employees']:,}", "355K+ dans l'industrie")
     with col2:
-        st.metric("Salaire Moyen", f"${avg_salary:,.0f}", "vs $120K tech traditionnel")
+        if currency in (BASE, LOCAL):
+            st.metric("Salaire Moyen", f"${kpis['avg_salary']:,.0f}", "vs $120K tech traditionnel")
+        else:
+            st.metric(f"Salaire Moyen ({frame_unit(data['salaries'], currency)})", f"{kpis['avg_salary']:,.0f}")
     with col3:
-        st.metric("Studios Analysés", f"{studios_count}", "Top employers mondiaux")
+        st.metric("Studios Analysés", f"{kpis['studios_count']}", "Top employers mondiaux")
     with col4:
-        st.metric("Taux Rétention", f"{avg_retention:.1f}%", "Moyenne industrie")
+        st.metric("Taux Rétention", f"{kpis['avg_retention']:.1f}%", "Moyenne industrie")
+    st.caption(f"KPIs : {kpis_source}")
 
     # Graphique d'évolution
     st.markdown("### 📈 Évolution de l'Industrie (2020-2024)")
@@ -167,116 +679,125 @@ if page == "🏠 Dashboard Principal":
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = px.line(data['evolution'], x='year', y='global_revenue_billion', 
-                     title='Revenus Globaux (Milliards $)',
-                     color_discrete_sequence=['#667eea'])
-        fig.update_layout(showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(dashboard['fig_revenue'], use_container_width=True)
 
     with col2:
-        fig = px.bar(data['evolution'], x='year', y='avg_gaming_salary',
-                    title='Évolution Salaire Moyen Gaming',
-                    color_discrete_sequence=['#764ba2'])
-        fig.update_layout(showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(dashboard['fig_salary'], use_container_width=True)
+
+    export_panel({
+        'gaming_salaries': view['salaries'],
+        'global_studios': view['studios'],
+        'industry_evolution': view['evolution']
+    }, 'dashboard')
 
 elif page == "⚔️ Talent Wars: Gaming vs Tech":
     st.markdown("### ⚔️ Gaming vs Tech - Analyse Comparative")
 
-    # Comparaison salaires
-    salary_comparison = data['salaries'].copy()
-    salary_comparison['salary_gap'] = salary_comparison['tech_salary_usd'] - salary_comparison['gaming_salary_usd']
-    salary_comparison['gap_percentage'] = (salary_comparison['salary_gap'] / salary_comparison['gaming_salary_usd']) * 100
+    search_notice(search_query, matched_roles, "rôle")
+    talent_wars = build_talent_wars(version, matched_roles, currency, rate_date)
 
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = px.bar(salary_comparison, x='experience_level', y=['gaming_salary_usd', 'tech_salary_usd'],
-                    title="Comparaison Salaires par Niveau d'Expérience",
-                    barmode='group', color_discrete_sequence=['#ff6b6b', '#4ecdc4'])
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(talent_wars['fig_levels'], use_container_width=True)
 
     with col2:
-        avg_gap = salary_comparison.groupby('role').agg({
-            'gap_percentage': 'mean',
-            'salary_gap': 'mean'
-        }).reset_index()
-
-        fig = px.bar(avg_gap, x='role', y='gap_percentage',
-                    title='Écart Salarial Moyen par Rôle (%)',
-                    color_discrete_sequence=['#ff9f43'])
-        fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(talent_wars['fig_gap'], use_container_width=True)
 
     # Tableau détaillé
     st.markdown("### 📋 Analyse Détaillée par Rôle")
-    detailed_analysis = salary_comparison.groupby(['role', 'experience_level']).agg({
-        'gaming_salary_usd': 'mean',
-        'tech_salary_usd': 'mean',
-        'salary_gap': 'mean',
-        'gap_percentage': 'mean'
-    }).round(0).reset_index()
+    # Le filtre fait partie de la clé de cache des tris
+    paged_dataframe(talent_wars['detailed_analysis'], 'talent_wars_detail',
+                    '|'.join((version, currency, rate_date) + matched_roles))
 
-    st.dataframe(detailed_analysis, use_container_width=True)
+    export_panel({
+        'talent_wars_detail': talent_wars['detailed_analysis'],
+        'gaming_salaries': talent_wars['salaries']
+    }, 'talent_wars')
 
 elif page == "🌍 Studios Globaux":
     st.markdown("### 🌍 Comparaison des Studios Gaming Mondiaux")
 
+    search_notice(search_query, matched_studios, "studio")
+    studios = build_studios(version, matched_studios, currency, rate_date)
+
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = px.scatter(data['studios'], x='avg_salary_usd', y='retention_rate', 
-                        size='employees', hover_name='studio_name',
-                        color='country', title='Salaire vs Rétention (Taille = Employés)',
-                        size_max=50)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(studios['fig_scatter'], use_container_width=True)
 
     with col2:
-        top_studios = data['studios'].nlargest(8, 'employees')
-        fig = px.bar(top_studios, x='employees', y='studio_name',
-                    title="Top Studios par Nombre d'Employés",
-                    orientation='h', color_discrete_sequence=['#667eea'])
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(studios['fig_top'], use_container_width=True)
 
     # Analyse par pays
     st.markdown("### 📊 Analyse par Pays")
-    country_analysis = data['studios'].groupby('country').agg({
-        'employees': 'sum',
-        'avg_salary_usd': 'mean',
-        'retention_rate': 'mean',
-        'neurodiversity_programs': 'sum'
-    }).round(0).reset_index()
 
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = px.pie(country_analysis, values='employees', names='country',
-                    title='Répartition Employés par Pays')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(studios['fig_countries'], use_container_width=True)
 
     with col2:
-        fig = px.bar(country_analysis, x='country', y='avg_salary_usd',
-                    title='Salaire Moyen par Pays',
-                    color_discrete_sequence=['#ff6b6b'])
-        fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(studios['fig_country_salary'], use_container_width=True)
+
+    # Projections Monte Carlo
+    st.markdown("### 🔮 Projections Effectifs & Rétention (Monte Carlo)")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        selected_studio = st.selectbox("Studio", studios['studios']['studio_name'])
+    with col2:
+        n_quarters = st.slider("Horizon (trimestres)", 4, 20, DEFAULT_PROJECTION['n_quarters'])
+    with col3:
+        n_simulations = st.select_slider("Simulations", options=[1000, 5000, 10000],
+                                         value=DEFAULT_PROJECTION['n_simulations'])
+
+    projection = project_studios(version, n_quarters, n_simulations)
+    studio_projection = projection[projection['studio_name'] == selected_studio]
+
+    col1, col2 = st.columns(2)
+
+    for col, metric, title, color in [
+        (col1, 'employees', "Projection des Effectifs", '102, 126, 234'),
+        (col2, 'retention_rate', "Projection du Taux de Rétention (%)", '118, 75, 162')
+    ]:
+        band = studio_projection[studio_projection['metric'] == metric]
+        fig = go.Figure()
+
+        for upper, lower, name, opacity in [('p95', 'p5', 'P5 - P95', 0.15),
+                                            ('p75', 'p25', 'P25 - P75', 0.35)]:
+            fig.add_trace(go.Scatter(x=band['quarter'], y=band[upper], mode='lines',
+                                     line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=band['quarter'], y=band[lower], mode='lines',
+                                     line=dict(width=0), fill='tonexty',
+                                     fillcolor=f'rgba({color}, {opacity})', name=name))
+
+        fig.add_trace(go.Scatter(x=band['quarter'], y=band['p50'], mode='lines+markers',
+                                 line=dict(color=f'rgb({color})'), name='Médiane'))
+        fig.update_layout(title=f"{title} - {selected_studio}", xaxis_title='Trimestre')
+
+        with col:
+            st.plotly_chart(fig, use_container_width=True)
+
+    export_panel({
+        'global_studios': studios['studios'],
+        'country_analysis': studios['country_analysis'],
+        'studio_projections': projection[projection['studio_name'].isin(studios['studios']['studio_name'])]
+    }, 'studios')
 
 elif page == "🧠 Neurodiversité & ROI":
     st.markdown("### 🧠 Impact de la Neurodiversité sur la Performance")
 
+    neurodiversity = build_neurodiversity(version)
+
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = px.bar(data['neurodiversity'], x='neurotypical_teams', y='metric',
-                    orientation='h', title='Performance Équipes Neurotypiques',
-                    color_discrete_sequence=['#95a5a6'])
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(neurodiversity['fig_neurotypical'], use_container_width=True)
 
     with col2:
-        fig = px.bar(data['neurodiversity'], x='neurodiverse_teams', y='metric',
-                    orientation='h', title='Performance Équipes Neurodiverses',
-                    color_discrete_sequence=['#3498db'])
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(neurodiversity['fig_neurodiverse'], use_container_width=True)
 
     # ROI Analysis
     st.markdown("### 💹 Analyse du ROI de la Neurodiversité")
@@ -284,94 +805,27 @@ elif page == "🧠 Neurodiversité & ROI":
     col1, col2 = st.columns(2)
 
     with col1:
-        colors = ['green' if x > 0 else 'red' for x in data['neurodiversity']['roi_percentage']]
-        fig = px.bar(data['neurodiversity'], x='metric', y='roi_percentage',
-                    title='ROI par Métrique (%)', color=colors,
-                    color_discrete_map={'green': '#27ae60', 'red': '#e74c3c'})
-        fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(neurodiversity['fig_roi'], use_container_width=True)
 
     with col2:
-        # Radar chart
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatterpolar(
-            r=data['neurodiversity']['neurotypical_teams'],
-            theta=data['neurodiversity']['metric'],
-            fill='toself',
-            name='Équipes Neurotypiques',
-            line_color='rgba(149, 165, 166, 0.8)'
-        ))
-
-        fig.add_trace(go.Scatterpolar(
-            r=data['neurodiversity']['neurodiverse_teams'],
-            theta=data['neurodiversity']['metric'],
-            fill='toself',
-            name='Équipes Neurodiverses',
-            line_color='rgba(52, 152, 219, 0.8)'
-        ))
-
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 150]
-                )),
-            showlegend=True,
-            title="Comparaison Performance - Radar"
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(neurodiversity['fig_radar'], use_container_width=True)
 
     # Recommandations
     st.markdown("### 💡 Insights Clés")
-    insights = [
-        "🚀 **Innovation +21%** : Les équipes neurodiverses montrent une innovation supérieure",
-        "⚡ **Résolution problèmes +30%** : Vitesse de résolution de problèmes considérablement améliorée", 
-        "🎯 **Détection bugs +30%** : Capacité supérieure à identifier les anomalies",
-        "🎨 **Solutions créatives +46%** : Approches créatives significativement plus développées",
-        "👥 **Rétention +23%** : Meilleure fidélisation des employés neurodiverses"
-    ]
-
-    for insight in insights:
+    for insight in neurodiversity['insights']:
         st.markdown(insight)
 
+    tables = {'neurodiversity_roi': roi_intervals(version)}
+    if 'neurodiversity_teams' in data:
+        tables['neurodiversity_teams'] = data['neurodiversity_teams']
+    export_panel(tables, 'neurodiversity')
+
 elif page == "💰 Analyse Compensation":
     st.markdown("### 💰 Analyse Approfondie des Compensations")
 
-    # Évolution temporelle
-    fig = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=('Revenus Globaux', 'Employés Totaux', 'Salaire Moyen', 'Licenciements'),
-        vertical_spacing=0.12
-    )
-
-    fig.add_trace(
-        go.Scatter(x=data['evolution']['year'], y=data['evolution']['global_revenue_billion'],
-                  name='Revenus (Mds $)', line=dict(color='#667eea')),
-        row=1, col=1
-    )
-
-    fig.add_trace(
-        go.Scatter(x=data['evolution']['year'], y=data['evolution']['total_employees_k'],
-                  name='Employés (K)', line=dict(color='#764ba2')),
-        row=1, col=2
-    )
-
-    fig.add_trace(
-        go.Scatter(x=data['evolution']['year'], y=data['evolution']['avg_gaming_salary'],
-                  name='Salaire Moyen', line=dict(color='#f093fb')),
-        row=2, col=1
-    )
-
-    fig.add_trace(
-        go.Bar(x=data['evolution']['year'], y=data['evolution']['layoffs_k'],
-               name='Licenciements (K)', marker_color='#ff6b6b'),
-        row=2, col=2
-    )
+    compensation = build_compensation(version, currency, rate_date)
 
-    fig.update_layout(height=600, showlegend=False, title_text="Évolution de l'Industrie Gaming (2020-2024)")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(compensation['fig_evolution'], use_container_width=True)
 
     # Distribution des salaires
     st.markdown("### 📊 Distribution des Salaires par Rôle")
@@ -379,56 +833,35 @@ elif page == "💰 Analyse Compensation":
     col1, col2 = st.columns(2)
 
     with col1:
-        fig = px.box(data['salaries'], x='role', y='gaming_salary_usd',
-                    title='Distribution Salaires Gaming',
-                    color_discrete_sequence=['#667eea'])
-        fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(compensation['fig_distribution'], use_container_width=True)
 
     with col2:
-        avg_by_role = data['salaries'].groupby('role')['gaming_salary_usd'].mean().reset_index()
-        fig = px.bar(avg_by_role, x='role', y='gaming_salary_usd',
-                    title='Salaire Moyen par Rôle',
-                    color_discrete_sequence=['#764ba2'])
-        fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(compensation['fig_by_role'], use_container_width=True)
+
+    export_panel({
+        'gaming_salaries': view['salaries'],
+        'industry_evolution': view['evolution']
+    }, 'compensation')
 
 elif page == "🎯 Stratégies Rétention":
     st.markdown("### 🎯 Stratégies de Rétention des Talents Gaming")
 
+    retention = build_retention(version)
+
     col1, col2 = st.columns(2)
 
     with col1:
-        # Bubble chart efficacité vs adoption
-        fig = px.scatter(data['retention'], x='effectiveness_score', y='gaming_adoption_rate',
-                        size='effectiveness_score', hover_name='strategy',
-                        title='Efficacité vs Adoption dans le Gaming',
-                        color='implementation_cost',
-                        color_discrete_map={'High': '#e74c3c', 'Medium': '#f39c12', 'Low': '#27ae60'})
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(retention['fig_bubble'], use_container_width=True)
 
     with col2:
-        fig = px.bar(data['retention'], x='strategy', y='effectiveness_score',
-                    title="Score d'Efficacité par Stratégie",
-                    color='implementation_cost',
-                    color_discrete_map={'High': '#e74c3c', 'Medium': '#f39c12', 'Low': '#27ae60'})
-        fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(retention['fig_effectiveness'], use_container_width=True)
 
     # Analyse coût-bénéfice
     st.markdown("### 💡 Analyse Coût-Bénéfice")
 
-    # Matrice de recommandations
-    retention_analysis = data['retention'].copy()
-    retention_analysis['cost_score'] = retention_analysis['implementation_cost'].map({'Low': 3, 'Medium': 2, 'High': 1})
-    retention_analysis['recommendation_score'] = (retention_analysis['effectiveness_score'] * 0.4 + 
-                                                 retention_analysis['gaming_adoption_rate'] * 0.3 + 
-                                                 retention_analysis['cost_score'] * 30) / 100 * 100
-
-    top_strategies = retention_analysis.nlargest(5, 'recommendation_score')[['strategy', 'effectiveness_score', 'implementation_cost', 'gaming_adoption_rate', 'recommendation_score']]
-
     st.markdown("#### 🏆 Top 5 Stratégies Recommandées")
-    st.dataframe(top_strategies.round(1), use_container_width=True)
+    paged_dataframe(retention['strategy_ranking'], 'retention_ranking', version, page_size=5,
+                    default_sort='recommendation_score', default_ascending=False)
 
     # Insights
     st.markdown("### 📋 Recommandations Clés")
@@ -443,6 +876,11 @@ elif page == "🎯 Stratégies Rétention":
     for rec in recommendations:
         st.markdown(rec)
 
+    export_panel({
+        'retention_ranking': retention['strategy_ranking'],
+        'retention_strategies': data['retention']
+    }, 'retention')
+
 # Footer
 st.markdown("---")
 st.markdown("""
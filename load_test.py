@@ -0,0 +1,312 @@
+"""
+🏋️ Gaming Workforce Observatory - Test de Charge
+Simule N sessions simultanées qui naviguent entre les pages de l'app
+
+Lance gaming_workforce_app.py avec `streamlit run` en local (ou cible un
+serveur déjà démarré) puis ouvre N sessions headless sur le websocket de
+Streamlit, comme autant d'onglets de navigateur. Chaque session suit un
+mélange pondéré de pages ; la latence d'un rerun va de l'envoi du
+changement de page à la réception de script_finished.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+APP_FILE = 'gaming_workforce_app.py'
+NAV_LABEL = "Choisissez une section:"
+
+# Mélange de navigation par défaut (poids relatifs)
+DEFAULT_MIX = {
+    "🏠 Dashboard Principal": 30,
+    "⚔️ Talent Wars: Gaming vs Tech": 20,
+    "🌍 Studios Globaux": 20,
+    "🧠 Neurodiversité & ROI": 10,
+    "💰 Analyse Compensation": 10,
+    "🎯 Stratégies Rétention": 10
+}
+
+
+def parse_mix(spec):
+    """'Dashboard=3,Studios=1' -> poids par page (correspondance sur le libellé)"""
+    if not spec:
+        return dict(DEFAULT_MIX)
+
+    mix = {}
+    for item in spec.split(','):
+        label, _, weight = item.partition('=')
+        matches = [page for page in DEFAULT_MIX if label.strip().lower() in page.lower()]
+        if not matches:
+            raise ValueError(f"Page inconnue dans le mélange: {label}")
+        mix[matches[0]] = float(weight or 1)
+    return mix
+
+
+def process_rss_mb(pid):
+    """Mémoire résidente d'un processus (Mo), None si indisponible"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / 1024 / 1024
+    except Exception:
+        return None
+
+
+class StreamlitServer:
+    """Serveur Streamlit local lancé pour la durée du test"""
+
+    def __init__(self, app_file=APP_FILE, port=8599):
+        self.app_file = app_file
+        self.port = port
+        self.process = None
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}"
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', self.app_file,
+             '--server.headless', 'true', '--server.port', str(self.port),
+             '--browser.gatherUsageStats', 'false'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            try:
+                urllib.request.urlopen(f"{self.url}/_stcore/health", timeout=1)
+                return self
+            except OSError:
+                if self.process.poll() is not None:
+                    break
+                time.sleep(0.5)
+        self.__exit__(None, None, None)
+        raise RuntimeError(f"Le serveur Streamlit n'a pas démarré sur le port {self.port}")
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class AppSession:
+    """Une session headless : un websocket, des reruns successifs"""
+
+    def __init__(self, url):
+        self.ws_url = url.replace('http', 'ws', 1).rstrip('/') + '/_stcore/stream'
+        self.ws = None
+        self.page_script_hash = ''
+        self.nav_id = None
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.ws_url, subprotocols=['streamlit'], max_size=None)
+        return await self.rerun()
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, page=None):
+        """Envoie un rerun (changement de page éventuel) et attend la fin du script
+
+        Renvoie le message d'erreur si le script a levé une exception.
+        """
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_script_hash
+        if page is not None:
+            widget = msg.rerun_script.widget_states.widgets.add()
+            widget.id = self.nav_id
+            widget.string_value = page
+        await self.ws.send(msg.SerializeToString())
+
+        error = None
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof('type')
+
+            if kind == 'new_session':
+                self.page_script_hash = forward.new_session.page_script_hash
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                element = forward.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'selectbox' and element.selectbox.label == NAV_LABEL:
+                    self.nav_id = element.selectbox.id
+                elif element_type == 'exception':
+                    error = f"{element.exception.type}: {element.exception.message}"
+            elif kind == 'script_finished':
+                if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    error = error or "Erreur de compilation du script"
+                return error
+
+
+class LoadTest:
+    def __init__(self, url, sessions=20, duration=60, mix=None, think_time=0.5,
+                 ramp_up=0, sample_interval=1.0, server_pid=None, seed=42):
+        self.url = url
+        self.sessions = sessions
+        self.duration = duration
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.think_time = think_time
+        self.ramp_up = ramp_up
+        self.sample_interval = sample_interval
+        self.server_pid = server_pid
+        self.seed = seed
+        self.records = []
+        self.memory = []
+
+    def _record(self, session, page, start, error=None):
+        self.records.append({
+            'session': session,
+            'page': page,
+            'time': start - self._start,
+            'latency_ms': (time.perf_counter() - start) * 1000,
+            'error': error
+        })
+
+    async def _session(self, session_id, deadline):
+        rng = np.random.default_rng(self.seed + session_id)
+        pages = list(self.mix)
+        weights = np.array(list(self.mix.values()), dtype=float)
+        weights /= weights.sum()
+
+        if self.ramp_up:
+            await asyncio.sleep(self.ramp_up * session_id / self.sessions)
+
+        session = AppSession(self.url)
+        start = time.perf_counter()
+        try:
+            # Première visite : page par défaut
+            self._record(session_id, "🏠 Dashboard Principal", start, await session.connect())
+
+            while time.perf_counter() < deadline:
+                page = pages[rng.choice(len(pages), p=weights)]
+                start = time.perf_counter()
+                self._record(session_id, page, start, await session.rerun(page))
+                if self.think_time:
+                    await asyncio.sleep(rng.exponential(self.think_time))
+        except Exception as e:
+            self._record(session_id, 'connexion', start, f"{type(e).__name__}: {e}")
+        finally:
+            await session.close()
+
+    async def _sample_memory(self, deadline):
+        while time.perf_counter() < deadline:
+            self.memory.append({
+                'time': time.perf_counter() - self._start,
+                'rss_mb': process_rss_mb(self.server_pid) if self.server_pid else None,
+                'reruns': len(self.records)
+            })
+            await asyncio.sleep(self.sample_interval)
+
+    async def _run(self):
+        self._start = time.perf_counter()
+        deadline = self._start + self.duration
+        await asyncio.gather(
+            self._sample_memory(deadline),
+            *(self._session(i, deadline) for i in range(self.sessions))
+        )
+        self.elapsed = time.perf_counter() - self._start
+
+    def run(self):
+        """Lance les sessions et renvoie (reruns, mémoire) en DataFrames"""
+        print(f"🏋️ Test de charge : {self.sessions} sessions pendant {self.duration}s sur {self.url}...")
+        asyncio.run(self._run())
+        return pd.DataFrame(self.records), pd.DataFrame(self.memory)
+
+
+def summarize(reruns, memory, elapsed):
+    """Débit, latences p50/p95/p99 par page et évolution mémoire"""
+    if reruns.empty:
+        print("⚠️ Aucun rerun enregistré")
+        return None
+
+    ok = reruns[reruns['error'].isna()]
+    errors = len(reruns) - len(ok)
+
+    def latency_stats(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+        return pd.Series({'reruns': len(latencies), 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99})
+
+    by_page = ok.groupby('page')['latency_ms'].apply(latency_stats).unstack()
+    overall = latency_stats(ok['latency_ms'])
+
+    print("=" * 60)
+    print(f"📈 Débit : {len(ok) / elapsed:.1f} reruns/s ({len(ok)} reruns, {errors} erreurs)")
+    print(f"⏱️ Latence : p50 {overall['p50_ms']:.0f} ms · p95 {overall['p95_ms']:.0f} ms · "
+          f"p99 {overall['p99_ms']:.0f} ms")
+    print("\n📄 Par page :")
+    print(by_page.round(0).to_string())
+
+    rss = memory['rss_mb'].dropna() if not memory.empty else memory
+    if len(rss):
+        print(f"\n🧠 Mémoire serveur : départ {rss.iloc[0]:.0f} Mo · "
+              f"pic {rss.max():.0f} Mo · fin {rss.iloc[-1]:.0f} Mo")
+        timeline = memory.dropna(subset=['rss_mb'])
+        timeline = timeline.set_index(timeline['time'].round(0).astype(int))[['rss_mb', 'reruns']]
+        step = max(1, len(timeline) // 10)
+        print(timeline.iloc[::step].round(0).to_string())
+
+    if errors:
+        print("\n❌ Erreurs :")
+        print(reruns.loc[reruns['error'].notna(), 'error'].value_counts().head(5).to_string())
+    print("=" * 60)
+
+    return by_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge Gaming Workforce Observatory")
+    parser.add_argument('--sessions', type=int, default=20, help="sessions simultanées")
+    parser.add_argument('--duration', type=float, default=60, help="durée du test (s)")
+    parser.add_argument('--mix', help="poids par page, ex. 'Dashboard=3,Studios=1,Talent=1'")
+    parser.add_argument('--think-time', type=float, default=0.5, help="pause moyenne entre pages (s)")
+    parser.add_argument('--ramp-up', type=float, default=0, help="étalement du démarrage des sessions (s)")
+    parser.add_argument('--sample-interval', type=float, default=1.0, help="échantillonnage mémoire (s)")
+    parser.add_argument('--port', type=int, default=8599, help="port du serveur lancé localement")
+    parser.add_argument('--url', help="serveur déjà démarré (sinon lancé localement)")
+    parser.add_argument('--pid', type=int, help="PID du serveur déjà démarré, pour la mémoire")
+    parser.add_argument('--output', help="préfixe des CSV détaillés (reruns et mémoire)")
+    args = parser.parse_args()
+
+    def run(url, pid):
+        test = LoadTest(url, sessions=args.sessions, duration=args.duration,
+                        mix=parse_mix(args.mix), think_time=args.think_time,
+                        ramp_up=args.ramp_up, sample_interval=args.sample_interval,
+                        server_pid=pid)
+        reruns, memory = test.run()
+        summarize(reruns, memory, test.elapsed)
+        return reruns, memory
+
+    if args.url:
+        reruns, memory = run(args.url, args.pid)
+    else:
+        with StreamlitServer(port=args.port) as server:
+            reruns, memory = run(server.url, server.process.pid)
+
+    if args.output:
+        reruns.to_csv(f"{args.output}_reruns.csv", index=False)
+        memory.to_csv(f"{args.output}_memory.csv", index=False)
+        print(f"💾 Résultats détaillés : {args.output}_reruns.csv, {args.output}_memory.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+📌 Gaming Workforce Observatory - Snapshot des KPIs
+Maintient data/metrics.json à partir de sommes et comptes courants
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+# Sommes courantes : (table, colonne) -> nom de la somme
+KPI_SUMS = {
+    ('studios', 'employees'): 'employees',
+    ('salaries', 'gaming_salary_usd'): 'gaming_salary',
+    ('studios', 'retention_rate'): 'retention'
+}
+
+# Format de kpi_state : un snapshot d'un autre format est recalculé
+STATE_FORMAT = 2
+
+
+def salary_weights(salaries):
+    """Poids de chaque ligne salaires : l'effectif du groupe, 1 par répondant sinon"""
+    if 'employees' in salaries.columns:
+        return salaries['employees'].to_numpy(dtype=float)
+    return np.ones(len(salaries))
+
+
+def average_salary(salaries, column='gaming_salary_usd'):
+    """Salaire moyen par employé (moyenne des groupes pondérée par leur effectif)"""
+    weights = salary_weights(salaries)
+    if weights.sum() == 0:
+        return float('nan')
+    return float(np.average(salaries[column].to_numpy(dtype=float), weights=weights))
+
+
+def live_kpis(salaries, studios):
+    """KPIs du dashboard calculés sur les tables complètes"""
+    return {
+        'total_employees': studios['employees'].sum(),
+        'avg_salary': average_salary(salaries),
+        'studios_count': len(studios),
+        'avg_retention': studios['retention_rate'].mean()
+    }
+
+
+class MetricsSnapshot:
+    def __init__(self, path='data/metrics.json'):
+        self.path = path
+        self.metrics = {}
+        self.state = None
+
+    def load(self):
+        """Charge le snapshot existant (les autres sections sont conservées)"""
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                self.metrics = json.load(f)
+        self.state = self.metrics.get('kpi_state')
+        return self
+
+    def is_fresh(self, version):
+        """Vrai si le snapshot correspond à cette version des données"""
+        return (self.state is not None and self.state.get('format') == STATE_FORMAT
+                and self.state.get('data_version') == version)
+
+    def rebuild(self, salaries, studios):
+        """Recalcule sommes et comptes à partir des tables complètes"""
+        tables = {'salaries': salaries, 'studios': studios}
+        # Salaires pondérés par effectif : le compte est le nombre d'employés
+        weights = {'salaries': salary_weights(salaries), 'studios': np.ones(len(studios))}
+        self.state = {
+            'format': STATE_FORMAT,
+            'sums': {name: float(tables[table][column].to_numpy(dtype=float) @ weights[table])
+                     for (table, column), name in KPI_SUMS.items()},
+            'counts': {'salaries': float(weights['salaries'].sum()), 'studios': len(studios)}
+        }
+
+    def apply_delta(self, table, column, old, new):
+        """Répercute sur la somme courante les seules valeurs modifiées"""
+        name = KPI_SUMS.get((table, column))
+        if self.state is None or name is None:
+            return
+        changed = old != new
+        self.state['sums'][name] += float((new[changed] - old[changed]).sum())
+
+    def apply_scale(self, table, column, factor):
+        """Une colonne multipliée par un facteur : la somme l'est aussi, en O(1)"""
+        name = KPI_SUMS.get((table, column))
+        if self.state is None or name is None:
+            return
+        self.state['sums'][name] *= factor
+
+    def kpis(self):
+        """KPIs du dashboard dérivés des sommes et comptes, en O(1)"""
+        sums, counts = self.state['sums'], self.state['counts']
+        return {
+            'total_employees': int(round(sums['employees'])),
+            'avg_salary': sums['gaming_salary'] / max(counts['salaries'], 1),
+            'studios_count': counts['studios'],
+            'avg_retention': sums['retention'] / max(counts['studios'], 1)
+        }
+
+    def drift(self, salaries, studios):
+        """KPIs du snapshot qui ne correspondent plus aux tables (liste vide si cohérent)"""
+        snapshot, live = self.kpis(), live_kpis(salaries, studios)
+        return [name for name, value in live.items() if not np.isclose(snapshot[name], value)]
+
+    def save(self, version):
+        """Écrit le snapshot pour cette version des données"""
+        self.state['data_version'] = version
+        self.state['updated_at'] = datetime.now().isoformat(timespec='seconds')
+
+        kpis = self.kpis()
+        wellness = self.metrics.setdefault('wellness_metrics', {})
+        wellness.update({
+            'total_employees': kpis['total_employees'],
+            'average_salary': round(kpis['avg_salary']),
+            'retention_rate': round(kpis['avg_retention'], 1),
+            'studios_analyzed': kpis['studios_count']
+        })
+        self.metrics['kpi_state'] = self.state
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.metrics, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
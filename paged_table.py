@@ -0,0 +1,72 @@
+"""
+📄 Gaming Workforce Observatory - Tables Paginées
+N'envoie au navigateur que la page visible d'une table triée côté serveur
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+@st.cache_resource(max_entries=64)
+def sort_permutation(table_key, version, column, _df):
+    """Permutation triant la table par colonne, calculée une fois par version
+
+    La table elle-même n'est pas hachée (préfixe _) : la clé de cache est
+    (table_key, version, column). cache_resource renvoie le tableau partagé
+    sans le recopier, contrairement à cache_data.
+    """
+    values = _df[column]
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.Series(pd.factorize(values, sort=True)[0])
+    return np.argsort(values.to_numpy(), kind='stable')
+
+
+def page_rows(df, table_key, version, sort_by, ascending, page, page_size):
+    """Lignes de la page demandée, en O(taille de page) une fois la permutation en cache"""
+    n_rows = len(df)
+    start = page * page_size
+    stop = min(start + page_size, n_rows)
+    if sort_by is None:
+        return df.iloc[start:stop]
+
+    permutation = sort_permutation(table_key, version, sort_by, df)
+    if not ascending:
+        # Vue inversée : aucune copie de la permutation
+        permutation = permutation[::-1]
+    return df.iloc[permutation[start:stop]]
+
+
+def paged_dataframe(df, table_key, version, page_size=25, default_sort=None, default_ascending=True):
+    """Affiche une table paginée et triée côté serveur"""
+    n_pages = max(1, math.ceil(len(df) / page_size))
+    columns = list(df.columns)
+    sort_options = [None] + columns
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+
+    with col1:
+        sort_by = st.selectbox(
+            "Trier par", sort_options,
+            index=sort_options.index(default_sort) if default_sort in columns else 0,
+            format_func=lambda c: "Ordre d'origine" if c is None else c,
+            key=f"{table_key}_sort"
+        )
+    with col2:
+        order = st.selectbox(
+            "Ordre", ["Croissant", "Décroissant"],
+            index=0 if default_ascending else 1,
+            key=f"{table_key}_order"
+        )
+    with col3:
+        page = st.number_input(
+            f"Page (sur {n_pages})", min_value=1, max_value=n_pages, value=1,
+            key=f"{table_key}_page"
+        )
+
+    rows = page_rows(df, table_key, version, sort_by, order == "Croissant", int(page) - 1, page_size)
+    st.dataframe(rows, use_container_width=True)
+    st.caption(f"Lignes {min((int(page) - 1) * page_size + 1, len(df))}-"
+               f"{(int(page) - 1) * page_size + len(rows)} sur {len(df):,}")
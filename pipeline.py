@@ -0,0 +1,267 @@
+"""
+⚙️ Gaming Workforce Observatory - Pipeline Incrémental
+Enchaîne génération → sauvegarde → mise à jour → validation en ne
+relançant que les étapes dont les entrées ont changé
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from data_generator import GamingDataGenerator
+from data_sources import table_log
+from update_data import EMPLOYEES_FILE, DataUpdater
+
+
+class PipelineStep:
+    def __init__(self, name, func, deps=(), inputs=(), outputs=(), params=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+
+
+class PipelineRunner:
+    def __init__(self, steps, state_path='data/pipeline_state.json', max_workers=4):
+        self.steps = {step.name: step for step in steps}
+        self.state_path = state_path
+        self.max_workers = max_workers
+        self.state = {'steps': {}, 'files': {}}
+
+        for step in steps:
+            missing = [dep for dep in step.deps if dep not in self.steps]
+            if missing:
+                raise ValueError(f"Étape {step.name}: dépendances inconnues {missing}")
+
+    def load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding='utf-8') as f:
+                self.state = json.load(f)
+        return self
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def file_hash(self, path):
+        """SHA-256 du contenu, réutilisé tant que taille et date sont inchangées"""
+        if not os.path.exists(path):
+            return None
+
+        stat = os.stat(path)
+        cached = self.state['files'].get(path)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        self.state['files'][path] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest.hexdigest()
+        }
+        return digest.hexdigest()
+
+    def stale_reason(self, step, executed, force=False):
+        """Raison de relancer l'étape, ou None si elle est à jour"""
+        record = self.state['steps'].get(step.name)
+        if force:
+            return "forcé"
+        if record is None:
+            return "jamais exécutée"
+        if record['params'] != step.params:
+            return "paramètres modifiés"
+        for dep in step.deps:
+            if dep in executed:
+                return f"dépendance {dep} relancée"
+        for path in step.outputs:
+            if not os.path.exists(path):
+                return f"sortie manquante {path}"
+        for path in step.inputs:
+            if self.file_hash(path) != record['inputs'].get(path):
+                return f"entrée modifiée {path}"
+        return None
+
+    def _execute(self, step):
+        start = time.perf_counter()
+        result = step.func()
+        return result, time.perf_counter() - start
+
+    def run(self, force=False, dry_run=False):
+        """Exécute les étapes périmées, en parallèle quand elles sont indépendantes"""
+        self.load_state()
+        report = []
+        executed, failed, finished = set(), set(), set()
+        pending = dict(self.steps)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name, step in list(pending.items()):
+                    if not all(dep in finished for dep in step.deps):
+                        continue
+                    del pending[name]
+
+                    blocked = [dep for dep in step.deps if dep in failed]
+                    if blocked:
+                        failed.add(name)
+                        finished.add(name)
+                        report.append({'step': name, 'status': 'bloquée', 'duration': 0.0,
+                                       'reason': f"dépendance {blocked[0]} en échec"})
+                        continue
+
+                    reason = self.stale_reason(step, executed, force)
+                    if reason is None or dry_run:
+                        finished.add(name)
+                        if reason is not None:
+                            executed.add(name)
+                        report.append({'step': name, 'status': 'à relancer' if reason else 'à jour',
+                                       'duration': 0.0, 'reason': reason or ''})
+                        continue
+
+                    running[pool.submit(self._execute, step)] = (step, reason)
+
+                if not running:
+                    if pending and not any(all(dep in finished for dep in step.deps)
+                                           for step in pending.values()):
+                        raise ValueError(f"Cycle de dépendances: {sorted(pending)}")
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, reason = running.pop(future)
+                    finished.add(step.name)
+                    try:
+                        result, duration = future.result()
+                    except Exception as e:
+                        result, duration = e, 0.0
+
+                    if result is False or isinstance(result, Exception):
+                        failed.add(step.name)
+                        self.state['steps'].pop(step.name, None)
+                        report.append({'step': step.name, 'status': 'échec', 'duration': duration,
+                                       'reason': str(result) if isinstance(result, Exception) else reason})
+                        continue
+
+                    # Entrées modifiées en place : on retient leur état après l'étape
+                    executed.add(step.name)
+                    self.state['steps'][step.name] = {
+                        'params': step.params,
+                        'inputs': {path: self.file_hash(path) for path in step.inputs},
+                        'outputs': {path: self.file_hash(path) for path in step.outputs},
+                        'duration': round(duration, 3),
+                        'finished_at': datetime.now().isoformat(timespec='seconds')
+                    }
+                    report.append({'step': step.name, 'status': 'exécutée',
+                                   'duration': duration, 'reason': reason})
+
+        if not dry_run:
+            self.save_state()
+        return report
+
+
+def current_period(today=None):
+    """Période de mise à jour (trimestre), ex. 2025-Q3"""
+    today = today or datetime.now()
+    return f"{today.year}-Q{(today.month - 1) // 3 + 1}"
+
+
+def build_pipeline(period=None, employee_level=True):
+    """Étapes du pipeline Gaming Workforce Observatory"""
+    period = period or current_period()
+    updater = DataUpdater()
+    # Les générateurs réinitialisent l'état aléatoire global : jamais en parallèle
+    generator_lock = threading.Lock()
+
+    def generate(method, *args):
+        with generator_lock:
+            return getattr(GamingDataGenerator(), method)(*args)
+
+    def update(method):
+        # La compaction tourne en arrière-plan mais doit finir avant que
+        # l'état des entrées soit enregistré
+        result = method()
+        updater.wait_for_compaction()
+        return result
+
+    # Base + journaux de deltas : le contenu effectif de chaque table
+    salaries_files = table_log('salaries').paths()
+    studios_files = table_log('studios').paths()
+
+    workforce_files = ['gaming_salaries.csv', 'global_studios.csv']
+    # Valeurs atypiques : tables agrégées et, en mode employés, salaires individuels
+    validate_files = salaries_files + studios_files
+    if employee_level:
+        workforce_files += [EMPLOYEES_FILE, 'country_aggregates.csv']
+        validate_files += [EMPLOYEES_FILE]
+
+    return [
+        PipelineStep('generate_workforce',
+                     lambda: generate('save_workforce_data', employee_level),
+                     outputs=workforce_files,
+                     params={'employee_level': employee_level}),
+        PipelineStep('generate_neurodiversity',
+                     lambda: generate('save_neurodiversity_data'),
+                     outputs=['neurodiversity_roi.csv', 'neurodiversity_teams.csv']),
+        PipelineStep('backup', updater.create_backup,
+                     deps=['generate_workforce', 'generate_neurodiversity'],
+                     params={'period': period}),
+        # Mises à jour non idempotentes (+5 % appliqué à chaque exécution) :
+        # une fois par période ou par nouvelle sauvegarde, jamais sur simple
+        # modification de la table qu'elles réécrivent elles-mêmes
+        PipelineStep('update_salaries', lambda: update(updater.fetch_salary_trends),
+                     deps=['backup'], outputs=['gaming_salaries.csv'],
+                     params={'period': period}),
+        PipelineStep('update_studios', lambda: update(updater.fetch_studio_metrics),
+                     deps=['backup'], outputs=['global_studios.csv'],
+                     params={'period': period}),
+        PipelineStep('validate', updater.validate_data,
+                     deps=['update_salaries', 'update_studios'],
+                     inputs=validate_files),
+        PipelineStep('snapshot', lambda: (updater.ensure_snapshot(), updater.save_snapshot()),
+                     deps=['update_salaries', 'update_studios'],
+                     inputs=salaries_files + studios_files,
+                     outputs=[updater.snapshot.path])
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline incrémental Gaming Workforce Observatory")
+    parser.add_argument('--force', action='store_true', help="relance toutes les étapes")
+    parser.add_argument('--dry-run', action='store_true', help="affiche les étapes à relancer")
+    parser.add_argument('--period', help="période de mise à jour (défaut : trimestre courant)")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    print("⚙️ Pipeline Gaming Workforce Observatory")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    runner = PipelineRunner(build_pipeline(args.period), max_workers=args.workers)
+    report = runner.run(force=args.force, dry_run=args.dry_run)
+
+    print("=" * 50)
+    icons = {'exécutée': '✅', 'à jour': '⏭️', 'à relancer': '🔁', 'échec': '❌', 'bloquée': '⛔'}
+    for entry in report:
+        reason = f" ({entry['reason']})" if entry['reason'] else ''
+        print(f"{icons[entry['status']]} {entry['step']:<24} {entry['status']:<11} "
+              f"{entry['duration']:.2f}s{reason}")
+    print(f"⏱️ Pipeline terminé en {time.perf_counter() - start:.2f}s")
+
+    return 0 if all(entry['status'] not in ('échec', 'bloquée') for entry in report) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+"""
+🔎 Gaming Workforce Observatory - Recherche Floue
+Index inversé de trigrammes sur les studios et les rôles, construit une
+fois par version des données
+"""
+
+import re
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+def normalize(text):
+    """Minuscules, sans accents ni ponctuation : 'Ubisoft  Montréal!' -> 'ubisoft montreal'"""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+
+def trigrams(text, prefix=False):
+    """Trigrammes de chaque mot, bornés par des espaces (à la pg_trgm)
+
+    Avec prefix=True, le dernier mot est en cours de frappe : pas de
+    trigramme de fin de mot, pour que 'ubi' corresponde à 'ubisoft'.
+    """
+    words = normalize(text).split()
+    grams = set()
+    for i, word in enumerate(words):
+        padded = f"  {word}" if prefix and i == len(words) - 1 else f"  {word} "
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Index inversé trigramme -> entrées, en listes de postings numpy
+
+    Score d'une entrée pour une requête Q (D : trigrammes de l'entrée,
+    S : trigrammes communs) : moyenne de la couverture de la requête
+    |S| / |Q| et de la similarité de Jaccard |S| / |Q ∪ D|. La première
+    tolère la frappe partielle et les fautes, la seconde départage en
+    faveur des noms les plus proches.
+    """
+
+    def __init__(self, entries):
+        """entries : couples (type, libellé), ex. ('studio', 'Ubisoft')"""
+        entries = list(dict.fromkeys((kind, str(label)) for kind, label in entries))
+        self.kinds = np.array([kind for kind, _ in entries])
+        self.labels = np.array([label for _, label in entries], dtype=object)
+
+        vocabulary, postings = {}, []
+        sizes = np.empty(len(entries), dtype=np.int32)
+        for doc, (_, label) in enumerate(entries):
+            grams = trigrams(label)
+            sizes[doc] = len(grams)
+            for gram in grams:
+                if gram not in vocabulary:
+                    vocabulary[gram] = len(postings)
+                    postings.append([])
+                postings[vocabulary[gram]].append(doc)
+
+        self.vocabulary = vocabulary
+        self.sizes = sizes
+        self.offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([len(p) for p in postings])
+        self.postings = np.fromiter((doc for p in postings for doc in p), dtype=np.int32,
+                                    count=int(self.offsets[-1]))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def search(self, query, limit=10, min_score=0.4, kind=None):
+        """Entrées classées par score décroissant (toutes avec limit=None)"""
+        query_grams = trigrams(query, prefix=True)
+        grams = [self.vocabulary[g] for g in query_grams if g in self.vocabulary]
+        n_query = len(query_grams)
+        if not grams:
+            return []
+
+        hits = np.concatenate([self.postings[self.offsets[g]:self.offsets[g + 1]] for g in grams])
+        shared = np.bincount(hits, minlength=len(self))
+        candidates = np.flatnonzero(shared)
+        if kind is not None:
+            candidates = candidates[self.kinds[candidates] == kind]
+
+        common = shared[candidates]
+        scores = (common / n_query + common / (n_query + self.sizes[candidates] - common)) / 2
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+
+        order = np.argsort(-scores, kind='stable')[:limit]
+        return [{'kind': self.kinds[i], 'label': self.labels[i], 'score': float(scores[j])}
+                for j, i in zip(order, candidates[order])]
+
+
+def build_index(studios, salaries):
+    """Index des studios et des rôles d'une version des données"""
+    entries = [('studio', name) for name in studios['studio_name']]
+    entries += [('role', role) for role in salaries['role'].unique()]
+    return TrigramIndex(entries)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    stems = ['Ubisoft', 'Epic', 'Riot', 'Nexon', 'Embracer', 'NetEase', 'Bandai Namco', 'Square Enix',
+             'Crytek', 'Paradox', 'Remedy', 'CD Projekt', 'Supercell', 'Rovio', 'Konami', 'Capcom']
+    suffixes = ['Games', 'Studios', 'Interactive', 'Entertainment', 'Montréal', 'Paris', 'Tokyo',
+                'Stockholm', 'Seoul', 'Shanghai', 'Mobile', 'Online', 'Ltd.', 'S.A.', '(Digital)']
+    names = pd.Series([f"{rng.choice(stems)} {rng.choice(suffixes)} {rng.choice(suffixes)} #{i}"
+                       for i in range(5000)])
+
+    start = time.perf_counter()
+    index = TrigramIndex(('studio', name) for name in names)
+    print(f"🔎 Index de {len(index):,} studios construit en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    queries = ['ubi', 'ubisfot montreal', 'bandai', 'cd projekt', 'square enix tokio', 'riot games', 'supercel']
+    for query in queries:
+        print(f"   {query!r}: {[hit['label'] for hit in index.search(query, limit=3)]}")
+
+    start = time.perf_counter()
+    n_runs = 1000
+    for i in range(n_runs):
+        index.search(queries[i % len(queries)])
+    print(f"⏱️ {(time.perf_counter() - start) / n_runs * 1000:.3f} ms par recherche")
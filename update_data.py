@@ -4,18 +4,32 @@ Met à jour les données depuis les sources externes
 """
 
 import pandas as pd
+import numpy as np
 import requests
 import json
 from datetime import datetime
+import glob
 import os
+import threading
+from data_sources import DATA_FILES, data_version, read_table, table_log
+from metrics_snapshot import MetricsSnapshot
+from outlier_detection import SegmentOutliers, snapshot_deltas
+
+# Salaires individuels écrits par data_generator.py (mode employés)
+EMPLOYEES_FILE = 'gaming_employees.parquet'
 
 class DataUpdater:
     def __init__(self):
         self.base_url = "https://api.example.com"  # API fictive
         self.last_update = datetime.now()
+        self.snapshot = MetricsSnapshot()
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_ready = False
+        self.logs = {name: table_log(name) for name in DATA_FILES}
+        self.outliers = {}
         
     def fetch_salary_trends(self):
-        """Récupère les dernières tendances salariales"""
+        """Récupère les dernières tendances salariales (False en cas d'échec)"""
         print("📈 Mise à jour des tendances salariales...")
         
         # Simulation d'appel API
@@ -26,26 +40,38 @@ class DataUpdater:
             # - Indeed API
             
             # Pour le moment, on charge les données existantes et on les met à jour
-            if os.path.exists('gaming_salaries.csv'):
-                df = pd.read_csv('gaming_salaries.csv')
+            log = self.logs['salaries']
+            if log.exists():
+                self.ensure_snapshot()
+                previous = log.read()
+                df = previous.copy()
                 
                 # Simulation d'une augmentation annuelle de 5%
                 df['gaming_salary_usd'] = df['gaming_salary_usd'] * 1.05
                 df['tech_salary_usd'] = df['tech_salary_usd'] * 1.03
                 
-                df.to_csv('gaming_salaries.csv', index=False)
+                # Toutes les lignes changent : le journal réécrit la base
+                log.write_changes(previous, df)
+                self.snapshot.apply_scale('salaries', 'gaming_salary_usd', 1.05)
                 print("✅ Données salaires mises à jour (+5% gaming, +3% tech)")
                 
         except Exception as e:
             print(f"❌ Erreur mise à jour salaires: {e}")
+            return False
+        return True
     
     def fetch_studio_metrics(self):
-        """Met à jour les métriques des studios"""
+        """Met à jour les métriques des studios (False en cas d'échec)"""
         print("🏢 Mise à jour des métriques studios...")
         
         try:
-            if os.path.exists('global_studios.csv'):
-                df = pd.read_csv('global_studios.csv')
+            log = self.logs['studios']
+            if log.exists():
+                self.ensure_snapshot()
+                df = log.read()
+                original = df.copy()
+                # Copie : les modifications en place de df ne doivent pas l'atteindre
+                previous = {col: original[col].to_numpy() for col in ['retention_rate', 'employees']}
                 
                 # Simulation de fluctuations réalistes
                 df['retention_rate'] = df['retention_rate'] + np.random.randint(-2, 3, len(df))
@@ -53,39 +79,65 @@ class DataUpdater:
                 
                 # Quelques studios augmentent leurs effectifs
                 growth_mask = np.random.choice([True, False], len(df), p=[0.3, 0.7])
-                df.loc[growth_mask, 'employees'] *= np.random.uniform(1.02, 1.15, growth_mask.sum())
-                df['employees'] = df['employees'].astype(int)
+                employees = df['employees'].astype(float)
+                employees[growth_mask] *= np.random.uniform(1.02, 1.15, growth_mask.sum())
+                df['employees'] = employees.astype(int)
                 
-                df.to_csv('global_studios.csv', index=False)
-                print("✅ Métriques studios mises à jour")
+                # Seules les lignes modifiées sont ajoutées au journal
+                changed = log.write_changes(original, df)
+                for col, old in previous.items():
+                    self.snapshot.apply_delta('studios', col, old, df[col].to_numpy())
+                print(f"✅ Métriques studios mises à jour ({changed} studios modifiés)")
                 
         except Exception as e:
             print(f"❌ Erreur mise à jour studios: {e}")
+            return False
+        return True
     
     def validate_data(self):
         """Valide l'intégrité des données"""
         print("🔍 Validation de l'intégrité des données...")
         
         issues = []
+        self.outliers = {}
         
         # Vérification salaires
-        if os.path.exists('gaming_salaries.csv'):
-            df = pd.read_csv('gaming_salaries.csv')
+        df = read_table('salaries')
+        if df is not None:
             if df['gaming_salary_usd'].min() < 20000 or df['gaming_salary_usd'].max() > 500000:
                 issues.append("Salaires gaming hors plage réaliste")
             if df.isnull().any().any():
                 issues.append("Valeurs manquantes dans données salaires")
+            # Salaires atypiques pour leur rôle × niveau × région
+            self.outliers['salaries'] = SegmentOutliers().detect(df)
+        
+        # Salaires individuels, par studio × rôle × niveau (le studio fixe la région)
+        if os.path.exists(EMPLOYEES_FILE):
+            detector = SegmentOutliers(keys=('studio_name', 'role', 'experience_level'), value='salary_usd')
+            self.outliers['employees'] = detector.scan_parquet(EMPLOYEES_FILE, columns=['employee_id'])
         
         # Vérification studios
-        if os.path.exists('global_studios.csv'):
-            df = pd.read_csv('global_studios.csv')
+        df = read_table('studios')
+        if df is not None:
             if df['retention_rate'].min() < 50 or df['retention_rate'].max() > 100:
                 issues.append("Taux de rétention incohérents")
+            # Sauts par studio depuis la dernière sauvegarde
+            backup = self.latest_backup('studios')
+            if backup:
+                self.outliers['studios'] = snapshot_deltas(pd.read_csv(backup), df)
+        
+        for name, flagged in self.outliers.items():
+            if len(flagged):
+                issues.append(f"{len(flagged)} valeur(s) atypique(s) dans {name}")
         
         if issues:
             print("⚠️ Problèmes détectés:")
             for issue in issues:
                 print(f"   - {issue}")
+            for name, flagged in self.outliers.items():
+                if len(flagged):
+                    print(f"🚨 {name} - valeurs les plus atypiques (score robuste):")
+                    print(flagged.head(5).to_string(index=False))
         else:
             print("✅ Données validées - Aucun problème détecté")
         
@@ -94,16 +146,68 @@ class DataUpdater:
     def create_backup(self):
         """Crée une sauvegarde des données actuelles"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_files = ['gaming_salaries.csv', 'global_studios.csv', 'neurodiversity_roi.csv']
         
-        for file in backup_files:
-            if os.path.exists(file):
+        for name, file in DATA_FILES.items():
+            df = read_table(name)
+            if df is not None:
+                # Sauvegarde de la table fusionnée (base + deltas)
                 backup_name = f"{file.split('.')[0]}_backup_{timestamp}.csv"
-                df = pd.read_csv(file)
                 df.to_csv(backup_name, index=False)
         
         print(f"💾 Sauvegarde créée - {timestamp}")
     
+    def latest_backup(self, name):
+        """Dernière sauvegarde d'une table, ou None"""
+        # Horodatage AAAAMMJJ_HHMMSS : l'ordre alphabétique est chronologique
+        backups = sorted(glob.glob(f"{DATA_FILES[name].split('.')[0]}_backup_*.csv"))
+        return backups[-1] if backups else None
+    
+    def prepare_snapshot(self):
+        """Charge le snapshot KPIs, le reconstruit s'il ne correspond plus aux données"""
+        self.snapshot.load()
+        if self.snapshot.is_fresh(data_version()):
+            return
+        
+        salaries, studios = read_table('salaries'), read_table('studios')
+        if salaries is None or studios is None:
+            self.snapshot.state = None
+            return
+        self.snapshot.rebuild(salaries, studios)
+    
+    def ensure_snapshot(self):
+        """Prépare le snapshot une seule fois, avant toute modification des tables"""
+        with self._snapshot_lock:
+            if not self._snapshot_ready:
+                self.prepare_snapshot()
+                self._snapshot_ready = True
+    
+    def wait_for_compaction(self):
+        """Attend les compactions lancées en arrière-plan"""
+        for log in self.logs.values():
+            log.wait()
+    
+    def save_snapshot(self):
+        """Écrit data/metrics.json pour la version courante des données
+
+        Renvoie False si les sommes courantes avaient divergé des tables.
+        """
+        if self.snapshot.state is None:
+            return True
+        
+        # Une compaction en cours changerait la version après coup
+        self.wait_for_compaction()
+        
+        # Contrôle : les KPIs incrémentaux doivent égaler ceux des tables fusionnées
+        salaries, studios = read_table('salaries'), read_table('studios')
+        drift = self.snapshot.drift(salaries, studios)
+        if drift:
+            print(f"⚠️ Snapshot KPIs divergent des tables ({', '.join(drift)}) - recalcul complet")
+            self.snapshot.rebuild(salaries, studios)
+        
+        self.snapshot.save(data_version())
+        print(f"📌 Snapshot KPIs mis à jour ({self.snapshot.path})")
+        return not drift
+    
     def update_all(self):
         """Lance la mise à jour complète"""
         print("🚀 Début mise à jour Gaming Workforce Observatory")
@@ -111,13 +215,15 @@ class DataUpdater:
         
         # Sauvegarde avant mise à jour
         self.create_backup()
+        self.ensure_snapshot()
         
         # Mises à jour
-        self.fetch_salary_trends()
-        self.fetch_studio_metrics()
+        updated = [self.fetch_salary_trends(), self.fetch_studio_metrics()]
+        consistent = self.save_snapshot()
         
         # Validation
-        if self.validate_data():
+        valid = self.validate_data()
+        if all(updated) and consistent and valid:
             print("\n✅ Mise à jour complétée avec succès!")
         else:
             print("\n⚠️ Mise à jour terminée avec des avertissements")
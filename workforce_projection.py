@@ -0,0 +1,166 @@
+"""
+🔮 Gaming Workforce Observatory - Projections Monte Carlo
+Simule l'évolution des effectifs et de la rétention des studios
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def _simulate_chunk(employees, retention, n_simulations, n_quarters, params, seed):
+    """Simule un bloc de studios et renvoie les percentiles par trimestre
+
+    Les tirages sont vectorisés sur trimestres × studios × simulations ;
+    seule la récurrence de la rétention (bornée à chaque pas) boucle sur
+    les trimestres.
+    """
+    rng = np.random.default_rng(seed)
+    n_studios = len(employees)
+    shape = (n_quarters, n_studios, n_simulations)
+    percentiles = np.asarray(params['percentiles'], dtype=np.float64)
+    # Percentiles "inverted_cdf" : rang de la k-ième simulation triée
+    ranks = (np.ceil(percentiles / 100 * n_simulations).clip(1, None) - 1).astype(int)
+
+    # Effectifs : un seul tirage uniforme sert au masque de croissance et au
+    # facteur (conditionnellement à u < p, u / p est uniforme sur [0, 1[)
+    p = params['growth_probability']
+    low, high = params['growth_range']
+    factors = rng.random(shape, dtype=np.float32)
+    no_growth = factors >= p
+    factors *= np.float32((high - low) / p)
+    factors += np.float32(low)
+    factors[no_growth] = 1
+    del no_growth
+    np.cumprod(factors, axis=0, out=factors)
+    factors.sort(axis=-1)
+    employees_bands = (
+        factors[..., ranks] * employees.astype(np.float32)[:, None]
+    ).transpose(2, 0, 1)
+    del factors
+
+    # Rétention : marche aléatoire entière bornée, percentiles par histogramme
+    r_low, r_high = params['retention_bounds']
+    j_low, j_high = params['retention_jitter']
+    n_values = r_high - r_low + 1
+    jitter = rng.integers(j_low, j_high + 1, size=shape, dtype=np.int8)
+    state = np.broadcast_to(
+        np.clip(np.rint(retention), r_low, r_high).astype(np.int8)[:, None],
+        (n_studios, n_simulations)
+    ).copy()
+    offsets = (np.arange(n_studios, dtype=np.int64) * n_values)[:, None]
+    counts = np.empty((n_quarters, n_studios, n_values), dtype=np.int64)
+    for quarter in range(n_quarters):
+        state += jitter[quarter]
+        np.clip(state, r_low, r_high, out=state)
+        codes = (state - r_low) + offsets
+        counts[quarter] = np.bincount(
+            codes.ravel(), minlength=n_studios * n_values
+        ).reshape(n_studios, n_values)
+    del jitter
+
+    cdf = np.cumsum(counts, axis=-1)
+    retention_bands = np.stack([
+        np.argmax(cdf > rank, axis=-1) + r_low for rank in ranks
+    ])
+
+    return employees_bands, retention_bands.astype(np.float32)
+
+
+class WorkforceProjector:
+    def __init__(self, n_simulations=10000, n_quarters=8, seed=42,
+                 max_workers=None, memory_budget_mb=256):
+        self.n_simulations = n_simulations
+        self.n_quarters = n_quarters
+        self.seed = seed
+        self.max_workers = max_workers
+        self.memory_budget_mb = memory_budget_mb
+        self.percentiles = (5, 25, 50, 75, 95)
+
+        # Dynamique trimestrielle, alignée sur DataUpdater.fetch_studio_metrics
+        self.params = {
+            'retention_jitter': (-2, 2),
+            'retention_bounds': (60, 95),
+            'growth_probability': 0.3,
+            'growth_range': (1.02, 1.15),
+            'percentiles': self.percentiles
+        }
+
+    def chunk_size(self):
+        """Nombre de studios simulés par bloc selon le budget mémoire"""
+        # float32 des effectifs, masque booléen, bruit et état int8
+        bytes_per_studio = self.n_quarters * self.n_simulations * 7
+        budget = self.memory_budget_mb * 1024 * 1024
+        return max(1, int(budget // bytes_per_studio))
+
+    def project(self, studios):
+        """Projette effectifs et rétention de chaque studio sur n_quarters trimestres
+
+        Renvoie un DataFrame long (studio_name, quarter, metric, p5 ... p95),
+        le trimestre 0 correspondant aux valeurs actuelles.
+        """
+        employees = studios['employees'].to_numpy(dtype=np.float64)
+        retention = studios['retention_rate'].to_numpy(dtype=np.float64)
+
+        size = self.chunk_size()
+        bounds = [(start, min(start + size, len(studios)))
+                  for start in range(0, len(studios), size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(bounds))
+        jobs = [
+            (employees[start:stop], retention[start:stop], self.n_simulations,
+             self.n_quarters, self.params, seed)
+            for (start, stop), seed in zip(bounds, seeds)
+        ]
+
+        workers = self.max_workers or 1
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                results = list(pool.map(_simulate_chunk, *zip(*jobs)))
+        else:
+            results = [_simulate_chunk(*job) for job in jobs]
+
+        bands = {
+            'employees': np.concatenate([r[0] for r in results], axis=2),
+            'retention_rate': np.concatenate([r[1] for r in results], axis=2)
+        }
+        initial = {'employees': employees, 'retention_rate': retention}
+
+        # Bandes : (percentiles, trimestres, studios) -> format long
+        n_studios = len(studios)
+        quarters = np.arange(self.n_quarters + 1)
+        frames = []
+        for metric, band in bands.items():
+            start = np.broadcast_to(initial[metric], (len(self.percentiles), 1, n_studios))
+            band = np.concatenate([start, band], axis=1)
+            frame = pd.DataFrame({
+                'studio_name': np.tile(studios['studio_name'].to_numpy(), len(quarters)),
+                'quarter': np.repeat(quarters, n_studios),
+                'metric': metric
+            })
+            for i, pct in enumerate(self.percentiles):
+                frame[f'p{pct}'] = band[i].ravel()
+            frames.append(frame)
+
+        return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    n_studios = 1000
+    rng = np.random.default_rng(0)
+    studios = pd.DataFrame({
+        'studio_name': [f'Studio {i}' for i in range(n_studios)],
+        'employees': rng.integers(50, 20000, n_studios),
+        'retention_rate': rng.integers(70, 95, n_studios)
+    })
+
+    projector = WorkforceProjector(n_simulations=10000, n_quarters=20,
+                                   max_workers=os.cpu_count())
+    print(f"🔮 Projection de {n_studios} studios "
+          f"({projector.n_simulations} simulations × {projector.n_quarters} trimestres)...")
+    start = time.perf_counter()
+    projection = projector.project(studios)
+    print(f"✅ Projection terminée en {time.perf_counter() - start:.1f}s")
+    print(projection.head())